@@ -1,47 +1,55 @@
+import os
+import secrets
 import streamlit as st
-from streamlit_gsheets import GSheetsConnection
 import pandas as pd
 import time
 from datetime import datetime, timedelta
 import extra_streamlit_components as stx
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import scoring
+import standings
+import storage
+import reminders
+import schema
+import indexes
+import leagues
+import auth
+import projections
+import runtime
 
 # 1. Page Configuration
 st.set_page_config(page_title="PDC Predictor Pro", page_icon="🎯", layout="wide")
 
+def scoring_rules():
+    # [scoring] exact / winner / margin / whitewash in secrets.toml; anything unset keeps the default (3 / 1 / 0 / 0)
+    try: config = dict(st.secrets.get("scoring", {}))
+    except Exception: config = {}
+    return scoring.MatchRules.from_config(config)
+
+RULES = scoring_rules()
+
+# (ttl, stale-while-revalidate window) in seconds; anything not listed is (5, 0)
+SHEET_POLICIES = {"Stats": (3600, 86400), "Matches": (600, 3600), "Users": (60, 0)}
+
+# Recorder, backend, sheet cache and write queue live in runtime.py, shared with pl_darts_2026.py.
+RT = runtime.App("pdc", SHEET_POLICIES, (5, 0))
+get_recorder, get_backend, get_images = runtime.get_recorder, runtime.get_backend, runtime.get_images
+get_cache, get_writer, get_rejects = RT.cache, RT.writer, RT.rejects
+prefetch, get_data, get_derived, put_data, put_rows = RT.prefetch, RT.get_data, RT.get_derived, RT.put_data, RT.put_rows
+
+@st.cache_resource
+def get_auth_secret():
+    # [auth] secret in secrets.toml, or DARTS_AUTH_SECRET, signs the login cookie. Without one a random
+    # secret is made per process, so everyone has to log in again after a restart.
+    try: secret = dict(st.secrets.get("auth", {})).get("secret", "")
+    except Exception: secret = ""
+    return os.environ.get("DARTS_AUTH_SECRET", secret) or secrets.token_hex(32)
+
+get_recorder().tally()
+rerun_span = get_recorder().span("rerun", "app.py")
+
 # --- 2. GMAIL MAILING ENGINE ---
 def send_reminders():
-    try:
-        conn_internal = st.connection("gsheets", type=GSheetsConnection)
-        spreadsheet_url = st.secrets["connections"]["gsheets"]["spreadsheet"]
-        u_df = conn_internal.read(spreadsheet=spreadsheet_url, worksheet="Users", ttl=0)
-        p_df = conn_internal.read(spreadsheet=spreadsheet_url, worksheet="Predictions", ttl=0)
-        m_df = conn_internal.read(spreadsheet=spreadsheet_url, worksheet="Matches", ttl=0)
-        today = datetime.now().date()
-        m_df['Date_Parsed'] = pd.to_datetime(m_df['Date']).dt.date
-        todays_mids = m_df[m_df['Date_Parsed'] == today]['Match_ID'].astype(str).str.replace('.0', '', regex=False).tolist()
-        if not todays_mids: return "No matches today."
-        users_with_email = u_df[u_df['Email'].astype(str).str.contains("@", na=False)]
-        remind_count = 0
-        server = smtplib.SMTP("smtp.gmail.com", 587)
-        server.starttls()
-        server.login(st.secrets["gmail"]["user"], st.secrets["gmail"]["password"])
-        for _, user in users_with_email.iterrows():
-            user_preds = p_df[p_df['Username'] == user['Username']]
-            user_pred_mids = user_preds['Match_ID'].astype(str).str.replace('.0', '', regex=False).tolist()
-            if not all(mid in user_pred_mids for mid in todays_mids):
-                msg = MIMEMultipart()
-                msg['From'] = f"PDC Predictor <{st.secrets['gmail']['user']}>"
-                msg['To'] = user['Email']
-                msg['Subject'] = "🎯 Darts Reminder: Matches Start Today!"
-                body = f"Hi {user['Username']},\n\nMatches are starting today! Don't forget to head over to the app and lock in your predictions.\n\nGood luck!"
-                msg.attach(MIMEText(body, 'plain'))
-                server.send_message(msg)
-                remind_count += 1
-        server.quit()
-        return f"Success: {remind_count} reminders sent."
+    try: return reminders.run(get_backend(), reminders.SMTPSettings.from_secrets(st.secrets["gmail"]))
     except Exception as e: return f"Gmail Error: {str(e)}"
 
 if st.query_params.get("trigger_reminders") == "true":
@@ -58,7 +66,9 @@ if 'audio_played' not in st.session_state: st.session_state['audio_played'] = Fa
 if 'logging_out' not in st.session_state: st.session_state['logging_out'] = False
 
 if st.session_state['username'] == "" and not st.session_state['logging_out']:
-    saved_user = cookie_manager.get(cookie="pdc_user_login")
+    # The cookie holds a signed token (auth.py), so restoring a session never reads the Users sheet.
+    token = cookie_manager.get(cookie="pdc_user_login")
+    saved_user = auth.read_token(token, get_auth_secret()) if token else None
     if saved_user:
         st.session_state['username'] = saved_user
         st.rerun()
@@ -72,16 +82,6 @@ initial_page_index = page_options.index(saved_page) if saved_page in page_option
 page = saved_page if saved_page in page_options else "Predictions"
 
 CHASE_THE_SUN_URL = "https://github.com/Domzy1888/DartsApp/raw/refs/heads/main/ytmp3free.cc_darts-chase-the-sun-extended-15-minutes-youtubemp3free.org.mp3"
-conn = st.connection("gsheets", type=GSheetsConnection)
-URL = st.secrets["connections"]["gsheets"]["spreadsheet"]
-
-@st.cache_data(ttl=5)
-def get_data(worksheet):
-    try:
-        df = conn.read(spreadsheet=URL, worksheet=worksheet, ttl=0)
-        return df.dropna(how='all')
-    except:
-        return pd.DataFrame()
 
 # --- 5. STYLING ---
 st.markdown("""
@@ -105,6 +105,7 @@ st.markdown("""
 
 # --- 6. SIDEBAR & AUTH ---
 st.sidebar.title("🎯 PDC PREDICTOR")
+if get_cache().syncing(): st.sidebar.caption(f"🕒 Data as of {get_cache().as_of():%d %b %H:%M}, syncing…" if get_cache().as_of() else "🕒 Syncing…")
 mute_audio = st.sidebar.toggle("🔈 Mute Walk-on Music", value=initial_mute)
 if mute_audio != initial_mute:
     cookie_manager.set("pdc_mute", str(mute_audio), expires_at=datetime.now() + timedelta(days=30))
@@ -116,24 +117,27 @@ if st.session_state['username'] == "":
     p_attempt = st.sidebar.text_input("Password", type="password")
     if auth_mode == "Register":
         email_val = st.sidebar.text_input("Email (Optional)").strip()
+        league_name = st.sidebar.text_input("League (Optional)", help="Anyone who enters the same name joins the same league; leave blank for the main league.")
     if st.sidebar.button("Go"):
-        u_df = get_data("Users")
+        users = get_derived("user_index", ("Users",), auth.UserIndex)
         if auth_mode == "Register":
             if u_attempt and p_attempt:
-                if not u_df.empty and u_attempt in u_df['Username'].astype(str).values: st.sidebar.error("Taken.")
+                if u_attempt in users: st.sidebar.error("Taken.")
+                elif leagues.invalid(league_name): st.sidebar.error(leagues.invalid(league_name))
+                elif not get_writer().submit("Users", {"Username": u_attempt, "Password": auth.hash_password(p_attempt), "Email": email_val if 'email_val' in locals() else "", "League": leagues.slug(league_name)}): st.sidebar.error("Taken.")
                 else:
-                    new_user = pd.DataFrame([{"Username": u_attempt, "Password": p_attempt, "Email": email_val if 'email_val' in locals() else ""}])
-                    conn.update(spreadsheet=URL, worksheet="Users", data=pd.concat([u_df, new_user], ignore_index=True))
                     st.sidebar.success("Created! Login now."); time.sleep(1); st.rerun()
         else:
-            if not u_df.empty:
-                match = u_df[(u_df['Username'].astype(str) == u_attempt) & (u_df['Password'].astype(str) == str(p_attempt))]
-                if not match.empty:
-                    st.session_state['username'] = u_attempt
-                    st.session_state['logging_out'] = False
-                    cookie_manager.set("pdc_user_login", u_attempt, expires_at=datetime.now() + timedelta(days=30))
-                    st.rerun()
-                else: st.sidebar.error("Invalid Login")
+            if users.verify(u_attempt, p_attempt):
+                # Plaintext passwords from before hashing are replaced on their first login.
+                if auth.needs_rehash(users.password(u_attempt)):
+                    try: put_rows("Users", pd.DataFrame([{**users.row(u_attempt), "Password": auth.hash_password(p_attempt)}]), ["Username"])
+                    except: pass
+                st.session_state['username'] = u_attempt
+                st.session_state['logging_out'] = False
+                cookie_manager.set("pdc_user_login", auth.make_token(u_attempt, get_auth_secret()), expires_at=datetime.now() + timedelta(seconds=auth.TOKEN_TTL))
+                st.rerun()
+            else: st.sidebar.error("Invalid Login")
 else:
     if not mute_audio and not st.session_state['audio_played']:
         st.audio(CHASE_THE_SUN_URL, format="audio/mp3", autoplay=True)
@@ -150,38 +154,52 @@ else:
         time.sleep(0.5); st.rerun()
 
 # --- 7. SCORING ENGINE ---
-def get_leaderboard_data():
-    p_df = get_data("Predictions"); r_df = get_data("Results")
-    if p_df.empty or r_df.empty: return pd.DataFrame(columns=['Username', 'Current Points'])
-    p_df['MID'] = p_df['Match_ID'].astype(str).str.replace('.0', '', regex=False)
-    r_df['MID'] = r_df['Match_ID'].astype(str).str.replace('.0', '', regex=False)
-    merged = p_df.merge(r_df, on="MID", suffixes=('_u', '_r'))
-    def calc(r):
+# Predictions, Standings and Reminders are stored per league (see leagues.py).
+members = get_derived("leagues", ("Users",), leagues.Membership)
+league = members.league(st.session_state['username'])
+
+def page_plan(page, league):
+    """Worksheets a page reads, fetched together before it renders (Admin loads its own after the password)."""
+    part = lambda ws: storage.partition(ws, league)
+    return {"Predictions": ["Matches", part("Predictions"), "Results", "Stats"],
+            "Leaderboard": [part("Standings"), part("Standings_History"), part("Predictions"), "Results"],
+            "Rival Watch": ["Matches", part("Predictions"), part("Standings"), "Results"]}.get(page, [])
+
+def get_leaderboard_data(league=league):
+    lb = get_data(storage.partition("Standings", league))
+    if lb.empty:
+        with get_recorder().span("compute", "leaderboard", league=league):
+            lb = scoring.leaderboard(get_data(storage.partition("Predictions", league)), get_data("Results"), RULES)
         try:
-            u1, u2 = map(int, str(r['Score_u']).split('-')); r1, r2 = map(int, str(r['Score_r']).split('-'))
-            if u1 == r1 and u2 == r2: return 3
-            return 1 if (u1 > u2 and r1 > r2) or (u1 < u2 and r1 < r2) else 0
-        except: return 0
-    merged['Pts'] = merged.apply(calc, axis=1)
-    return merged.groupby('Username')['Pts'].sum().reset_index().rename(columns={'Pts': 'Current Points'}).sort_values('Current Points', ascending=False)
+            # Never persist standings built from snapshot data that has not synced yet.
+            if not lb.empty and not get_cache().syncing(storage.partition("Standings", league), storage.partition("Predictions", league), "Results"):
+                put_data(storage.partition("Standings", league), lb)
+        except: pass
+    return lb  # as stored; RankIndex and leagues.combine do the sorting
+
+def get_projection(league=league):
+    # Title odds: the rest of the season simulated once per version of the sheets it reads (see projections.py)
+    def build(lb, preds, results, matches, stats):
+        with get_recorder().span("compute", "projection", league=league):
+            return projections.project_matches(lb if not lb.empty else scoring.leaderboard(preds, results, RULES), matches, preds, results, stats, RULES)
+    return get_derived(f"projection@{league}", (storage.partition("Standings", league), storage.partition("Predictions", league), "Results", "Matches", "Stats"), build)
 
 # --- 8. THE H2H DIALOG ---
+# Stats columns parsed to floats once per Stats version ("45%", "£1,200,000" -> 45.0, 1200000.0)
+STAT_COLUMNS = ["World Ranking", "Total Earnings", "Televised Titles", "Season Win %", "Highest Average", "Checkout %", "180s (12m)"]
+
 @st.dialog(" ", width="medium")
 def show_h2h_comparison(p1_name, p2_name, img1, img2):
-    stats_df = get_data("Stats")
-    try:
-        s1 = stats_df[stats_df['Player Name'].str.contains(p1_name, case=False, na=False)].iloc[0]
-        s2 = stats_df[stats_df['Player Name'].str.contains(p2_name, case=False, na=False)].iloc[0]
-        
-        # --- DATA FORMATTING FIXES ---
-        rank1 = int(float(s1['World Ranking']))
-        rank2 = int(float(s2['World Ranking']))
-        earn1 = f"£{int(float(s1['Total Earnings'])):,}"
-        earn2 = f"£{int(float(s2['Total Earnings'])):,}"
-        
-    except Exception as e:
-        st.error(f"Data formatting error: {e}")
+    players = get_derived("player_index", ("Stats",), lambda df: indexes.PlayerIndex(df, "Player Name", STAT_COLUMNS))
+    s1, s2 = players.get(p1_name), players.get(p2_name)
+    missing = [n for n, s in ((p1_name, s1), (p2_name, s2)) if s is None]
+    if missing:
+        st.error(f"No stats found for {' & '.join(missing)}")
         return
+    rank1 = int(s1.num['World Ranking'])
+    rank2 = int(s2.num['World Ranking'])
+    earn1 = f"£{int(s1.num['Total Earnings']):,}"
+    earn2 = f"£{int(s2.num['Total Earnings']):,}"
 
     st.markdown(f"""
         <style>
@@ -238,14 +256,9 @@ def show_h2h_comparison(p1_name, p2_name, img1, img2):
         <hr style="border: 0.5px solid rgba(255,215,0,0.3); margin: 20px 0;">
     """, unsafe_allow_html=True)
 
-    def draw_bar(label, v1, v2):
-        def clean(x):
-            try:
-                return float(str(x).replace('%','').replace('£','').replace(',',''))
-            except:
-                return 0.0
-        
-        n1, n2 = clean(v1), clean(v2)
+    def draw_bar(label, col):
+        v1, v2 = s1[col], s2[col]
+        n1, n2 = s1.num[col], s2.num[col]
         total = n1 + n2
         
         if total > 0:
@@ -266,90 +279,185 @@ def show_h2h_comparison(p1_name, p2_name, img1, img2):
             </div>
         """, unsafe_allow_html=True)
 
-    draw_bar("Televised Titles", s1['Televised Titles'], s2['Televised Titles'])
-    draw_bar("Season Win %", s1['Season Win %'], s2['Season Win %'])
-    draw_bar("Highest Average", s1['Highest Average'], s2['Highest Average'])
-    draw_bar("Checkout %", s1['Checkout %'], s2['Checkout %'])
-    draw_bar("180s (12m)", s1['180s (12m)'], s2['180s (12m)'])
+    draw_bar("Televised Titles", 'Televised Titles')
+    draw_bar("Season Win %", 'Season Win %')
+    draw_bar("Highest Average", 'Highest Average')
+    draw_bar("Checkout %", 'Checkout %')
+    draw_bar("180s (12m)", '180s (12m)')
 
 # --- 9. PAGES ---
+def lock_pick(mid, kickoff):
+    # Form callback: runs before the card reruns, so the card comes back already showing the lock.
+    # The card only reruns on interaction, so its form can outlive kickoff: check the time again here.
+    if datetime.now() >= kickoff:
+        st.session_state[f"lock_msg_{mid}"] = "Closed before you submitted 🔒"
+        return
+    score = f"{st.session_state[f's1_{mid}']}-{st.session_state[f's2_{mid}']}"
+    # Appended through the shared queue; a double submit is a no-op
+    saved = get_writer().submit(storage.partition("Predictions", league), {"Username": st.session_state['username'], "Match_ID": mid, "Score": score})
+    # Callbacks cannot draw inside a fragment; the card shows the message when it reruns.
+    st.session_state[f"lock_msg_{mid}"] = "Saved!" if saved else "Already locked."
+
+# Only the timer ticks: it is its own fragment, rerun every minute without touching any data.
+@st.fragment(run_every=60)
+def card_timer(kickoff):
+    mins = (kickoff - datetime.now()).total_seconds() / 60
+    if mins > 60: st.markdown(f"<div class='timer-text' style='color:#00ff00;'>Starts in {int(mins/60)}h {int(mins%60)}m</div>", unsafe_allow_html=True)
+    elif 0 < mins <= 60: st.markdown("<div class='timer-text timer-urgent'>⚠️ STARTING SOON</div>", unsafe_allow_html=True)
+    else: st.markdown("<div class='timer-text' style='color:#ff4b4b;'>Locked / Live</div>", unsafe_allow_html=True)
+
+# Each match card is a fragment: a pick or a stats click reruns only that card, and its data
+# comes from the cached prediction index.
+@st.fragment
+def match_card(row):
+    span = get_recorder().span("fragment", "match_card")
+    mid = int(row['Match_ID'])
+    my_preds = get_derived(f"prediction_index@{league}", (storage.partition("Predictions", league), "Results"), indexes.PredictionIndex).predicted(st.session_state['username'])
+    mins = (row['Date'] - datetime.now()).total_seconds() / 60
+    msg = st.session_state.pop(f"lock_msg_{mid}", None)
+    if msg: st.toast(msg)
+
+    card_timer(row['Date'])
+    st.markdown(f"<div class='match-card'><div class='match-wrapper'><div class='player-box'><img src=\"{get_images().get(row.get('P1_Image'))}\" class='player-img'><div class='player-name'>{row['Player1']}</div></div><div class='vs-text'>VS</div><div class='player-box'><img src=\"{get_images().get(row.get('P2_Image'))}\" class='player-img'><div class='player-name'>{row['Player2']}</div></div></div></div>", unsafe_allow_html=True)
+
+    # Stats Button
+    if st.button(f"📊 Stats: {row['Player1']} vs {row['Player2']}", key=f"stats_{mid}"):
+        show_h2h_comparison(row['Player1'], row['Player2'], get_images().get(row.get('P1_Image')), get_images().get(row.get('P2_Image')))
+
+    if mid in my_preds:
+        st.success(f"Prediction Locked ✅ ({my_preds[mid]})")
+    elif mins <= 0:
+        st.error("Closed 🔒")
+    else:
+        # Creating a unique form for this match
+        with st.form(f"form_{mid}", clear_on_submit=False):
+            c1, c2 = st.columns(2)
+            with c1:
+                st.selectbox(f"{row['Player1']}", range(11), key=f"s1_{mid}")
+            with c2:
+                st.selectbox(f"{row['Player2']}", range(11), key=f"s2_{mid}")
+
+            st.form_submit_button("🔒 LOCK PREDICTION", on_click=lock_pick, args=(mid, row['Date']))
+    span.end(mid=mid)
+
+RIVALS_PER_PAGE = 50
+LEADERBOARD_PER_PAGE = 50
+LEADERBOARD_AROUND = 5
+prefetch(page, page_plan(page, league))
+page_span = get_recorder().span("page", page)
 if page == "Predictions":
     if st.session_state['username'] == "": st.warning("Please sign in.")
     else:
         st.title("Upcoming Matches")
         m_df = get_data("Matches").dropna(subset=['Match_ID', 'Player1', 'Date'])
-        p_df = get_data("Predictions"); r_df = get_data("Results"); now = datetime.now()
-        m_df['Date_Parsed'] = pd.to_datetime(m_df['Date'], errors='coerce')
-        days = sorted(m_df['Date_Parsed'].dt.date.unique())
+        pred_idx = get_derived(f"prediction_index@{league}", (storage.partition("Predictions", league), "Results"), indexes.PredictionIndex)
+        my_preds = pred_idx.predicted(st.session_state['username']); now = datetime.now()
+        days = sorted(m_df['Date'].dt.date.unique())
         
         if days:
             sel_day = st.selectbox("📅 Select Match Day", days)
-            day_matches = m_df[m_df['Date_Parsed'].dt.date == sel_day]
-            
-            for _, row in day_matches.iterrows():
-                mid = str(row['Match_ID']).replace('.0', '')
-                if not r_df.empty and mid in r_df['Match_ID'].astype(str).str.replace('.0', '', regex=False).values: continue
-                
-                diff = row['Date_Parsed'] - now
-                mins = diff.total_seconds() / 60
-                
-                if mins > 60: timer = f"<div class='timer-text' style='color:#00ff00;'>Starts in {int(mins/60)}h {int(mins%60)}m</div>"
-                elif 0 < mins <= 60: timer = f"<div class='timer-text timer-urgent'>⚠️ STARTING SOON</div>"
-                else: timer = "<div class='timer-text' style='color:#ff4b4b;'>Locked / Live</div>"
-                
-                st.markdown(f"<div class='match-card'>{timer}<div class='match-wrapper'><div class='player-box'><img src=\"{row.get('P1_Image', '')}\" class='player-img'><div class='player-name'>{row['Player1']}</div></div><div class='vs-text'>VS</div><div class='player-box'><img src=\"{row.get('P2_Image', '')}\" class='player-img'><div class='player-name'>{row['Player2']}</div></div></div></div>", unsafe_allow_html=True)
-                
-                # Stats Button
-                if st.button(f"📊 Stats: {row['Player1']} vs {row['Player2']}", key=f"stats_{mid}"):
-                    show_h2h_comparison(row['Player1'], row['Player2'], row.get('P1_Image',''), row.get('P2_Image',''))
-
-                # --- UPDATED FORM LOGIC TO PREVENT KEYERROR ---
-                user_has_predicted = not p_df[(p_df['Username'] == st.session_state['username']) & (p_df['Match_ID'].astype(str).str.replace('.0', '', regex=False) == mid)].empty if not p_df.empty else False
-                
-                if user_has_predicted:
-                    st.success("Prediction Locked ✅")
-                elif mins <= 0:
-                    st.error("Closed 🔒")
-                else:
-                    # Creating a unique form for this match
-                    with st.form(f"form_{mid}", clear_on_submit=False):
-                        c1, c2 = st.columns(2)
-                        with c1: 
-                            s1_val = st.selectbox(f"{row['Player1']}", range(11), key=f"s1_{mid}")
-                        with c2: 
-                            s2_val = st.selectbox(f"{row['Player2']}", range(11), key=f"s2_{mid}")
-                        
-                        submit = st.form_submit_button("🔒 LOCK PREDICTION")
-                        
-                        if submit:
-                            # We use the local variables s1_val and s2_val directly
-                            score_str = f"{s1_val}-{s2_val}"
-                            new_pred = pd.DataFrame([{"Username": st.session_state['username'], "Match_ID": mid, "Score": score_str}])
-                            
-                            # Update Sheets
-                            conn.update(spreadsheet=URL, worksheet="Predictions", data=pd.concat([p_df, new_pred], ignore_index=True))
-                            
-                            st.cache_data.clear()
-                            st.success("Saved!")
-                            time.sleep(1)
-                            st.rerun()
+            day_matches = m_df[m_df['Date'].dt.date == sel_day]
+            pending = day_matches['Match_ID'].astype(int).map(lambda m: m not in pred_idx.resulted and m not in my_preds)
+            open_matches = day_matches[pending & (day_matches['Date'] > now)]
 
+            # --- WHOLE DAY BATCH FORM ---
+            # Every pick of the day in one append; kickoffs are re-checked at submit time and
+            # already locked matches come back as not written, so a double submit changes nothing.
+            if len(open_matches) > 1:
+                with st.expander(f"⚡ Predict the whole day ({len(open_matches)} open)"):
+                    with st.form(f"day_form_{sel_day}"):
+                        picks = {}
+                        for _, row in open_matches.iterrows():
+                            mid = int(row['Match_ID'])
+                            c1, c2 = st.columns(2)
+                            with c1: s1_val = st.selectbox(f"{row['Player1']}", range(11), index=None, placeholder="-", key=f"day_s1_{mid}")
+                            with c2: s2_val = st.selectbox(f"{row['Player2']}", range(11), index=None, placeholder="-", key=f"day_s2_{mid}")
+                            picks[mid] = (s1_val, s2_val, row)
+                        if st.form_submit_button("🔒 LOCK ALL PICKS"):
+                            now = datetime.now()
+                            half = [f"{r['Player1']} v {r['Player2']}" for s1, s2, r in picks.values() if (s1 is None) != (s2 is None)]
+                            closed = [f"{r['Player1']} v {r['Player2']}" for s1, s2, r in picks.values() if s1 is not None and s2 is not None and r['Date'] <= now]
+                            rows = [{"Username": st.session_state['username'], "Match_ID": mid, "Score": f"{s1}-{s2}"}
+                                    for mid, (s1, s2, r) in picks.items() if s1 is not None and s2 is not None and r['Date'] > now]
+                            if half: st.error(f"Pick both scores for: {', '.join(half)}")
+                            elif not rows and not closed: st.warning("No picks entered.")
+                            else:
+                                saved = get_writer().submit_many(storage.partition("Predictions", league), rows) if rows else []
+                                if closed: st.toast(f"Closed before you submitted: {', '.join(closed)}", icon="🔒")
+                                if sum(saved): st.toast(f"{sum(saved)} prediction(s) locked ✅")
+                                if len(saved) - sum(saved): st.toast(f"{len(saved) - sum(saved)} already locked.")
+                                st.rerun()
+
+            # The day's photos are fetched together once; after that every card reads local thumbnails.
+            get_images().warm(pd.concat([day_matches.get('P1_Image', pd.Series()), day_matches.get('P2_Image', pd.Series())]).dropna())
+            for _, row in day_matches.iterrows():
+                if int(row['Match_ID']) not in pred_idx.resulted: match_card(row)
 
 elif page == "Leaderboard":
     st.title("🏆 Leaderboard")
-    st.dataframe(get_leaderboard_data(), hide_index=True, width="stretch")
+    me = st.session_state['username']
+    scope = st.radio("Show", [leagues.label(league), "All Leagues"], horizontal=True, label_visibility="collapsed") if len(members.leagues) > 1 else None
+    if scope == "All Leagues":
+        lbs = {lg: get_leaderboard_data(lg) for lg in members.leagues}  # rebuilds any Standings that are empty
+        ranks = get_derived("ranks:all", tuple(storage.partition("Standings", lg) for lg in members.leagues), lambda *lb: indexes.RankIndex(leagues.combine(dict(zip(members.leagues, lb)), 'Current Points')))
+        # A rebuilt table that could not be saved yet is not in the sheets the index was built from.
+        if len(ranks) != sum(map(len, lbs.values())): ranks = indexes.RankIndex(leagues.combine(lbs, 'Current Points'))
+        hist = None
+    else:
+        # Movement and history come from the per-match-day snapshots; nothing is replayed here.
+        hist = get_derived(f"history@{league}", (storage.partition("Standings_History", league),), indexes.StandingsHistory)
+        lb = get_leaderboard_data()  # rebuilds Standings if it is empty
+        ranks = get_derived(f"ranks@{league}", (storage.partition("Standings", league),), indexes.RankIndex)
+        if len(ranks) != len(lb): ranks = indexes.RankIndex(lb)
+    if len(ranks):
+        # Only one window of the table is rendered: a page from the top, or the rows around you.
+        if me in ranks: st.caption(f"You are ranked #{ranks.rank(me)} of {len(ranks)}")
+        view = st.radio("View", ["Top", "Around me"], horizontal=True) if me in ranks else "Top"
+        if view == "Around me": window = ranks.around(me, LEADERBOARD_AROUND)
+        else:
+            pages = -(-len(ranks) // LEADERBOARD_PER_PAGE)
+            pg = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+            window = ranks.rows((pg - 1) * LEADERBOARD_PER_PAGE, pg * LEADERBOARD_PER_PAGE)
+        if hist is not None: window = window.assign(Move=[standings.arrow(hist.movement.get(u, 0)) for u in window['Username'].astype(str)])
+        # Off by default: the first look after new results runs the simulation.
+        odds = get_projection() if hist is not None and st.toggle("🔮 Title odds", help="Plays out the remaining matches many times, using the players' stats and everyone's picks") else None
+        if odds is not None and len(odds): window = window.merge(odds.table()[['Username', 'Win %', 'Top 3 %', 'Avg Finish']], on='Username', how='left')
+        st.dataframe(window, hide_index=True, width="stretch")
+        if odds is not None and len(odds):
+            st.caption(f"🔮 {odds.seasons:,} simulated seasons of the {odds.events} match(es) still to play; picks not made yet score nothing.")
+            names = window['Username'].astype(str).tolist()
+            who = st.selectbox("🔮 Finishing positions for", names, index=names.index(me) if me in names else 0, key="odds_who")
+            st.bar_chart(odds.distribution(who), x_label="Finish", y_label="% of seasons", sort=False)
+        if hist is not None and hist.movement:
+            names = window['Username'].astype(str).tolist()
+            who = st.selectbox("📈 History for", names, index=names.index(me) if me in names else 0)
+            h = hist.user(who).set_index('Day')
+            if h.empty: st.info(f"No history for {who} yet.")
+            else:
+                c1, c2 = st.columns(2)
+                with c1: st.caption("Points"); st.line_chart(h['Points'])
+                with c2: st.caption("Rank (1 = top)"); st.line_chart(h['Rank'])
 
 elif page == "Rival Watch":
     st.title("👀 Rival Watch")
-    m_df = get_data("Matches").dropna(subset=['Match_ID', 'Player1'])
-    p_df = get_data("Predictions"); opts = [f"{str(r['Match_ID']).replace('.0', '')}: {r['Player1']} vs {r['Player2']}" for _, r in m_df.iterrows()]
-    if opts:
-        sel = st.selectbox("Pick a Match:", opts); target = sel.split(":")[0]; lb = get_leaderboard_data()
-        if not p_df.empty:
-            p_df['MID'] = p_df['Match_ID'].astype(str).str.replace('.0', '', regex=False)
-            match_p = p_df[p_df['MID'] == target].drop_duplicates('Username', keep='last')
-            rivals = match_p.merge(lb, on="Username", how="left").fillna(0)
-            st.dataframe(rivals[['Username', 'Score', 'Current Points']], hide_index=True, width="stretch")
+    m_df = get_data("Matches").dropna(subset=['Match_ID', 'Player1']).drop_duplicates('Match_ID')
+    if not m_df.empty:
+        names = dict(zip(m_df['Match_ID'], zip(m_df['Player1'].astype(str), m_df['Player2'].astype(str))))
+        target = st.selectbox("Pick a Match:", list(names), format_func=lambda mid: f"{mid}: {names[mid][0]} vs {names[mid][1]}")
+        get_leaderboard_data()  # rebuilds Standings if it is empty, so picks are ranked by real points
+        picks = get_derived(f"match_picks@{league}", (storage.partition("Predictions", league), storage.partition("Standings", league)), indexes.MatchPicks)
+        n = picks.count(target)
+        if n:
+            pick, votes = picks.consensus(target); split = picks.outcomes(target)
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Predictions", n)
+            c2.metric("Consensus Pick", pick, f"{votes / n:.0%} of users", delta_color="off")
+            c3.metric(f"{names[target][0]} / {names[target][1]}", f"{split[1] / n:.0%} / {split[-1] / n:.0%}")
+            st.bar_chart(picks.histogram(target).head(15).rename("Users"))
+            pages = -(-n // RIVALS_PER_PAGE)
+            pg = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+            st.dataframe(picks.rows(target, (pg - 1) * RIVALS_PER_PAGE, pg * RIVALS_PER_PAGE), hide_index=True, width="stretch")
+        else: st.info("No predictions for this match yet.")
 
 elif page == "Highlights":
     st.title("📺 PDC Highlights")
@@ -361,12 +469,76 @@ elif page == "Admin":
     st.title("⚙️ Admin Hub")
     if st.text_input("Admin Password", type="password") == "darts2025":
         m_df = get_data("Matches").dropna(subset=['Match_ID', 'Player1'])
-        target = st.selectbox("Select Match", [f"{str(r['Match_ID']).replace('.0', '')}: {r['Player1']} vs {r['Player2']}" for _, r in m_df.iterrows()])
+        day_of = m_df.dropna(subset=['Date']).drop_duplicates('Match_ID').set_index('Match_ID')['Date'].dt.date.astype(str)
+        target = st.selectbox("Select Match", [f"{r['Match_ID']}: {r['Player1']} vs {r['Player2']}" for _, r in m_df.iterrows()])
         c1, r1 = st.columns(2); c2, r2 = st.columns(2)
         with c1: r1 = st.selectbox("P1", range(11))
         with c2: r2 = st.selectbox("P2", range(11))
         if st.button("Submit Result"):
+            get_cache().invalidate("Results", *[storage.partition(ws, lg) for lg in members.leagues for ws in ("Standings", "Standings_History")])
+            mid = int(target.split(":")[0])
             old = get_data("Results")
-            new = pd.concat([old, pd.DataFrame([{"Match_ID": target.split(":")[0], "Score": f"{r1}-{r2}"}])])
-            conn.update(spreadsheet=URL, worksheet="Results", data=new)
-            st.cache_data.clear(); st.success("Result Published!"); st.rerun()
+            prev = old[old['Match_ID'] == mid] if not old.empty else old
+            new_row, _ = schema.coerce("Results", pd.DataFrame([{"Match_ID": mid, "Score": f"{r1}-{r2}"}]))
+            new = pd.concat([old.drop(prev.index), new_row])
+            put_rows("Results", new_row, ["Match_ID"])
+            # Once every match of this match's day has a result, that day gets a standings snapshot (later ones are re-chained onto it).
+            day = day_of.get(mid)
+            day = day if day in standings.complete_days(day_of, new) else None
+            # Only this match moves each league's table; a corrected result reverses its old points first.
+            # The result is already saved, so a failed table update is reported for a Rebuild instead of crashing.
+            failed = []
+            for lg in members.leagues:
+                try:
+                    preds = get_data(storage.partition("Predictions", lg))
+                    if preds.empty: continue
+                    lb = get_data(storage.partition("Standings", lg))
+                    if lb.empty: lb = scoring.leaderboard(preds, new, RULES)
+                    else: lb = standings.apply_delta(lb, standings.match_delta(preds, new_row, prev, RULES), 'Current Points')
+                    put_data(storage.partition("Standings", lg), lb)
+                    if day:
+                        hist = storage.partition("Standings_History", lg)
+                        delta = standings.match_delta(preds, new[new['Match_ID'].isin(day_of.index[day_of == day])], rules=RULES)
+                        put_rows(hist, standings.rechain(get_data(hist), day, delta), ["Day"])
+                except Exception as e: failed.append(f"{leagues.label(lg)}: {e}")
+            if failed: st.warning("Result saved, but standings were not updated for " + "; ".join(failed) + ". Run Rebuild Standings once fixed."); st.stop()
+            st.success("Result Published!"); st.rerun()
+        if st.button("Rebuild Standings"):
+            get_cache().invalidate("Results", *[storage.partition(ws, lg) for lg in members.leagues for ws in ("Standings", "Standings_History")])
+            fixed, results = 0, get_data("Results")
+            for lg in members.leagues:
+                preds = get_data(storage.partition("Predictions", lg))
+                rebuilt = scoring.leaderboard(preds, results, RULES)
+                diff = standings.compare(get_data(storage.partition("Standings", lg)), rebuilt, 'Current Points')
+                if rebuilt.empty and diff.empty: continue
+                put_data(storage.partition("Standings", lg), rebuilt)
+                scored = scoring.score_predictions(preds, results, RULES)
+                put_data(storage.partition("Standings_History", lg), standings.replay(standings.day_deltas(scored, scored['Match_ID'].map(day_of), standings.complete_days(day_of, results))))
+                if not diff.empty: st.dataframe(diff.assign(League=leagues.label(lg)), hide_index=True); fixed += len(diff)
+            if not fixed: st.success("Standings verified ✅")
+            else: st.warning(f"Standings rebuilt, {fixed} users corrected.")
+        with st.expander("What-if Scoring"):
+            # Rescores the whole history from the scored picks kept per data version; nothing is written.
+            st.caption(f"Live rules: {RULES}. To adopt new ones, set them under [scoring] in secrets.toml, then Rebuild Standings.")
+            cols = st.columns(4)
+            alt = scoring.MatchRules(**{f: int(col.number_input(f.title(), min_value=0, max_value=50, value=getattr(RULES, f), key=f"wi_{f}")) for col, f in zip(cols, ("exact", "winner", "margin", "whitewash"))})
+            wl = st.selectbox("League", members.leagues, format_func=leagues.label, key="wi_league") if len(members.leagues) > 1 else leagues.DEFAULT
+            scored = get_derived(f"scored@{wl}@{RULES}", (storage.partition("Predictions", wl), "Results"), lambda p, r: scoring.score_predictions(p, r, RULES) if not p.empty and not r.empty else None)
+            if scored is None or scored.empty: st.info("Nothing scored yet.")
+            else:
+                start = time.perf_counter(); wi = scoring.what_if(scored, alt)
+                st.caption(f"{len(scored):,} predictions rescored in {(time.perf_counter() - start) * 1000:.0f} ms; {int((wi['Moved'] != 0).sum())} users change rank.")
+                st.dataframe(wi.head(LEADERBOARD_PER_PAGE), hide_index=True, width="stretch")
+        rejects = {ws: df for ws, df in get_rejects().items() if not df.empty}
+        with st.expander(f"Data Validation ({sum(len(df) for df in rejects.values())} rejected cells)"):
+            for ws, df in rejects.items():
+                st.write(f"**{ws}**"); st.dataframe(df, hide_index=True, width="stretch")
+        with st.expander("Sheet Cache"):
+            st.dataframe(get_cache().stats(), hide_index=True, width="stretch")
+        with st.expander("Diagnostics"):
+            st.caption("Latency percentiles (ms) over the last {} events".format(len(get_recorder().events)))
+            st.dataframe(get_recorder().percentiles(), hide_index=True, width="stretch")
+            st.dataframe(get_recorder().counts(), hide_index=True, width="stretch")
+
+page_span.end()
+rerun_span.end(page=page, **get_recorder().tally())
@@ -0,0 +1,83 @@
+"""Password hashes, the username-keyed user index, and signed session tokens for both apps.
+
+Passwords are stored in the Users sheet's Password column as
+"pbkdf2_sha256$<iterations>$<salt>$<hash>". Rows still holding a plaintext password (from before
+hashing) are accepted once and rehashed by the app on that login.
+
+A session token is "<base64 username:expiry>.<hmac>", signed with the [auth] secret, so a cookie
+can be checked without reading the Users sheet and cannot be forged by editing it."""
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+
+ALGORITHM = "pbkdf2_sha256"
+ITERATIONS = 200_000
+TOKEN_TTL = 30 * 86400
+
+def hash_password(password, salt=None, iterations=ITERATIONS):
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", str(password).encode(), salt.encode(), iterations)
+    return f"{ALGORITHM}${iterations}${salt}${base64.b64encode(digest).decode()}"
+
+def is_hashed(stored):
+    return str(stored).startswith(ALGORITHM + "$")
+
+def verify_password(password, stored):
+    """True if password matches the stored hash (or the legacy plaintext value)."""
+    stored = "" if stored is None else str(stored)
+    if not is_hashed(stored): return bool(stored) and hmac.compare_digest(stored.encode(), str(password).encode())
+    try:
+        _, iterations, salt, _ = stored.split("$")
+        return hmac.compare_digest(hash_password(password, salt, int(iterations)), stored)
+    except ValueError: return False
+
+def needs_rehash(stored):
+    if not is_hashed(stored): return True
+    try: return int(str(stored).split("$")[1]) < ITERATIONS
+    except (IndexError, ValueError): return True
+
+class UserIndex:
+    """Username -> Users row, built once per Users version so a login is one dict lookup."""
+    def __init__(self, users):
+        if users.empty or 'Password' not in users.columns:
+            self._rows = {}
+            return
+        # Duplicate usernames: the first row wins.
+        rows = users.assign(Username=users['Username'].astype(str), Password=users['Password'].fillna("").astype(str)).drop_duplicates('Username')
+        self._rows = {r['Username']: r for r in rows.to_dict('records')}
+
+    def __contains__(self, username):
+        return str(username) in self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def row(self, username):
+        return self._rows.get(str(username))
+
+    def password(self, username):
+        row = self.row(username)
+        return None if row is None else row.get('Password')
+
+    def verify(self, username, password):
+        stored = self.password(username)
+        return stored is not None and verify_password(password, stored)
+
+def _sign(payload, secret):
+    return hmac.new(str(secret).encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+def make_token(username, secret, ttl=TOKEN_TTL, now=None):
+    expires = int((now or time.time()) + ttl)
+    payload = base64.urlsafe_b64encode(f"{username}:{expires}".encode()).decode()
+    return f"{payload}.{_sign(payload, secret)}"
+
+def read_token(token, secret, now=None):
+    """The username a token was issued to, or None if it is malformed, tampered with or expired."""
+    try:
+        payload, signature = str(token).rsplit(".", 1)
+        if not hmac.compare_digest(signature, _sign(payload, secret)): return None
+        username, expires = base64.urlsafe_b64decode(payload.encode()).decode().rsplit(":", 1)
+        return username if int(expires) > (now or time.time()) else None
+    except (ValueError, UnicodeDecodeError): return None
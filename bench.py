@@ -0,0 +1,215 @@
+"""Benchmarks for the data paths behind both apps, run against workload.py sheets.
+
+    python bench.py --scale 10k --out bench-10k.json
+    python bench.py --scale 1m --repeat 3 --compare bench-1m-before.json
+    python bench.py --scale 100 --apptest          # also render the Predictions page
+
+Each case replays what a page does (same modules, same cache, no network) over a
+storage.FakeConnection, so `--latency` adds a simulated round trip to every sheet read/write.
+Results are written as JSON together with the git commit, so runs on two commits can be
+diffed with --compare."""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+import pandas as pd
+import auth
+import indexes
+import projections
+import reminders
+import schema
+import scoring
+import sheetcache
+import snapshots
+import standings
+import storage
+import workload
+
+def make_env(sheets, latency=0.0):
+    conn = storage.FakeConnection(sheets, latency)
+    backend = storage.GSheetsBackend(conn, "bench")
+    cache = sheetcache.SheetCache(lambda ws: schema.coerce(ws, backend.read(ws))[0])
+    return conn, backend, cache
+
+# --- CASES ---
+# Each takes (env, sheets) and mirrors one app code path; the cache is already warm unless noted.
+# env is (connection, backend, warm cache, snapshot directory).
+PAGE_SHEETS = ("Users", "Matches", "Predictions", "Results", "Standings")
+
+def case_load_sheets(env, sheets):
+    # Cold start: every sheet the Predictions + Leaderboard pages touch, read and typed.
+    _, _, cache = make_env(sheets, env[0].latency)
+    for ws in PAGE_SHEETS: cache.get(ws)
+
+def case_load_parallel(env, sheets):
+    # Cold start through a page plan: the same sheets fetched together on the cache's thread pool.
+    _, _, cache = make_env(sheets, env[0].latency)
+    return cache.get_many(PAGE_SHEETS)
+
+def case_load_snapshot(env, sheets):
+    # Cold start with a local snapshot: the same sheets come from disk, the re-read runs in the background.
+    _, _, cache = make_env(sheets, env[0].latency)
+    snapshots.SnapshotStore(env[3]).seed(cache)
+    for ws in PAGE_SHEETS: cache.get(ws)
+
+def case_leaderboard(env, sheets):
+    # get_leaderboard_data() with an empty Standings sheet (full rebuild)
+    cache = env[2]
+    lb = cache.get("Standings")
+    if lb.empty: lb = scoring.leaderboard(cache.get("Predictions"), cache.get("Results"))
+    return lb.astype({'Current Points': int}).sort_values('Current Points', ascending=False)
+
+def case_pl_leaderboard(env, sheets):
+    # calculate_leaderboard() in pl_darts_2026.py
+    cache = env[2]
+    users = cache.get("Users")
+    lb = scoring.pl_leaderboard(users, cache.get("User_Submissions"), cache.get("PL_Results"))
+    return standings.with_users(lb, users, "Total")
+
+def case_rival_watch(env, sheets):
+    # A new data version: rebuild the per-match picks, then render one match's first page.
+    cache = env[2]
+    picks = indexes.MatchPicks(cache.get("Predictions"), case_leaderboard(env, sheets))
+    target = int(cache.get("Matches")['Match_ID'].iloc[-1])
+    return picks.histogram(target), picks.outcomes(target), picks.rows(target, 0, 50)
+
+def case_rank_index(env, sheets):
+    # Leaderboard page on a new Standings version: rank everyone once, then render the two windows.
+    ranks = indexes.RankIndex(case_leaderboard(env, sheets))
+    me = ranks.usernames[len(ranks) // 2] if len(ranks) else ""
+    return ranks.rows(0, 50), ranks.around(me, 5), ranks.rank(me)
+
+def case_what_if(env, sheets):
+    # Admin what-if: the scored history is kept per data version, only the rescoring is timed.
+    cache = env[2]
+    scored = cache.derived("scored", ("Predictions", "Results"), scoring.score_predictions)
+    return scoring.what_if(scored, scoring.MatchRules(exact=5, winner=2, margin=1, whitewash=1))
+
+def case_projection(env, sheets):
+    # Leaderboard title odds on a new data version: every unresulted match simulated (seasons capped by MAX_WORK).
+    cache = env[2]
+    return projections.project_matches(case_leaderboard(env, sheets), cache.get("Matches"), cache.get("Predictions"), cache.get("Results"), cache.get("Stats"))
+
+def case_pl_projection(env, sheets):
+    # PL title odds: every night without results played through its bracket.
+    cache = env[2]
+    return projections.project_nights(case_pl_leaderboard(env, sheets), cache.get("PL_2026_Admin"), cache.get("User_Submissions"), cache.get("PL_Results"), cache.get("Stats"))
+
+def case_prediction_index(env, sheets):
+    # Predictions page card loop: build the index once, then one lookup per match card.
+    cache = env[2]
+    idx = indexes.PredictionIndex(cache.get("Predictions"), cache.get("Results"))
+    mine = idx.predicted(str(sheets["Users"]['Username'].iloc[0]))
+    return [(mid in idx.resulted, mid in mine) for mid in cache.get("Matches")['Match_ID']]
+
+def case_login(env, sheets):
+    # Login then cookie restore: one index lookup and a PBKDF2 check (the workload's last user is
+    # hashed), and a signed token round trip.
+    users = env[2].derived("user_index", ("Users",), auth.UserIndex)
+    last = len(sheets["Users"]) - 1
+    name = str(sheets["Users"]['Username'].iloc[last])
+    assert not auth.needs_rehash(users.password(name)) and users.verify(name, f"pw{last}")
+    return auth.read_token(auth.make_token(name, "bench"), "bench") == name
+
+def case_reminders(env, sheets):
+    # send_reminders() up to delivery: who still needs a mail today (dry run, no SMTP).
+    return reminders.run(env[1], reminders.SMTPSettings(), day=datetime.now().date(), dry_run=True)
+
+CASES = {"load_sheets": case_load_sheets, "load_parallel": case_load_parallel, "load_snapshot": case_load_snapshot, "leaderboard": case_leaderboard, "pl_leaderboard": case_pl_leaderboard,
+         "rival_watch": case_rival_watch, "rank_index": case_rank_index, "what_if": case_what_if, "projection": case_projection,
+         "pl_projection": case_pl_projection, "prediction_index": case_prediction_index, "login": case_login, "reminders": case_reminders}
+
+def bench_predictions_page(sheets, repeat):
+    """Render app.py's Predictions page with streamlit's AppTest over a SQLite copy of the sheets.
+
+    Returns (first render, reruns): the first includes loading every sheet, reruns are what a
+    widget interaction costs once the cache is warm."""
+    from streamlit.testing.v1 import AppTest
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "bench.db")
+        backend = storage.SQLiteBackend(db)
+        for ws, df in sheets.items(): backend.write(ws, df)
+        # Everything the app writes locally goes under tmp, so no benchmark data is left for a real start to seed from.
+        env = {"DARTS_STORAGE": "sqlite", "DARTS_DB": db, "DARTS_SNAPSHOT": os.path.join(tmp, "snapshot"),
+               "DARTS_TELEMETRY": os.path.join(tmp, "telemetry.jsonl"), "DARTS_IMAGES": os.path.join(tmp, "images")}
+        saved = {k: os.environ.get(k) for k in env}
+        os.environ.update(env)
+        try:
+            at = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"), default_timeout=600)
+            at.session_state["username"] = str(sheets["Users"]['Username'].iloc[0])
+            start = time.perf_counter(); at.run(); first = time.perf_counter() - start
+            if at.exception: raise RuntimeError(at.exception[0].message)
+            reruns = []
+            for _ in range(repeat):
+                start = time.perf_counter(); at.run(); reruns.append(time.perf_counter() - start)
+        finally:
+            for k, v in saved.items():
+                if v is None: os.environ.pop(k, None)
+                else: os.environ[k] = v
+    return [first], reruns
+
+def summarize(runs):
+    return {"runs": [round(r, 6) for r in runs], "min": round(min(runs), 6), "median": round(statistics.median(runs), 6)}
+
+def run(scale="10k", repeat=5, latency=0.0, cases=None, apptest=False, seed=0):
+    sheets = workload.generate(scale, seed=seed)
+    env = make_env(sheets, latency)
+    store = snapshots.SnapshotStore(tempfile.mkdtemp(prefix="bench-snapshot-"))
+    for ws in sheets: store.save(ws, env[2].get(ws))
+    env += (store.directory,)
+    results = {}
+    try:
+        for name in cases or CASES:
+            fn = CASES[name]
+            fn(env, sheets)
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter(); fn(env, sheets); runs.append(time.perf_counter() - start)
+            results[name] = summarize(runs)
+    finally:
+        shutil.rmtree(store.directory, ignore_errors=True)
+    if apptest:
+        first, reruns = bench_predictions_page(sheets, repeat)
+        results["predictions_page_first"], results["predictions_page_rerun"] = summarize(first), summarize(reruns)
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError: commit = ""
+    return {"commit": commit, "scale": scale, "rows": {ws: len(df) for ws, df in sheets.items()}, "repeat": repeat,
+            "latency": latency, "python": platform.python_version(), "pandas": pd.__version__,
+            "timestamp": datetime.now().isoformat(timespec="seconds"), "results": results}
+
+def compare(old, new):
+    lines = [f"{'case':<24}{'before':>10}{'after':>10}{'change':>9}"]
+    for name, r in new["results"].items():
+        before = old["results"].get(name, {}).get("median")
+        after = r["median"]
+        change = f"{(after / before - 1) * 100:+.0f}%" if before else "new"
+        lines.append(f"{name:<24}{before if before is not None else '-':>10}{after:>10}{change:>9}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Time the apps' data paths on a synthetic workload.")
+    ap.add_argument("--scale", default="10k", choices=list(workload.SCALES))
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every fake sheet read/write")
+    ap.add_argument("--case", action="append", choices=list(CASES), help="run only these cases")
+    ap.add_argument("--apptest", action="store_true", help="also render the Predictions page (needs streamlit)")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--compare", help="results JSON from an earlier run to compare against")
+    args = ap.parse_args(argv)
+    report = run(args.scale, args.repeat, args.latency, args.case, args.apptest)
+    if args.out:
+        with open(args.out, "w") as f: json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f: print(compare(json.load(f), report))
+    else:
+        json.dump(report["results"], sys.stdout, indent=2); print()
+
+if __name__ == "__main__":
+    main()
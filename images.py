@@ -0,0 +1,133 @@
+"""Player photos as small local thumbnails, served as static files.
+
+Each distinct image URL is downloaded once, shrunk to fit THUMB_SIZE and stored as WebP in a
+content-addressed directory (<sha256 of the thumbnail>.webp), so URLs that serve the same picture
+share one file. index.json maps URL -> file and remembers when each was last used; once the
+directory grows past max_bytes the least recently used thumbnails are dropped. Cards link to a
+thumbnail by its base_url (the directory sits under the app's static/ folder, which Streamlit
+serves). A file's URL never changes, so reruns only re-send the URL and the browser reuses the
+image it already downloaded. A URL that cannot be fetched or decoded gets PLACEHOLDER
+and is only retried after retry_after seconds."""
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+THUMB_SIZE = (240, 240)   # 2x the largest size a card shows (120px)
+MAX_DOWNLOAD = 10 * 1024 * 1024
+PLACEHOLDER = "data:image/svg+xml;base64," + base64.b64encode(
+    b"<svg xmlns='http://www.w3.org/2000/svg' width='120' height='120'><rect width='120' height='120' rx='10' fill='#222'/>"
+    b"<circle cx='60' cy='45' r='22' fill='#555'/><rect x='25' y='75' width='70' height='35' rx='17' fill='#555'/></svg>").decode()
+
+def thumbnail(data, size=THUMB_SIZE):
+    """Image bytes (any format PIL reads) -> WebP bytes no larger than size."""
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        img.thumbnail(size)
+        out = io.BytesIO()
+        img.save(out, "WEBP", quality=80)
+    return out.getvalue()
+
+def fetch(url, timeout=5):
+    req = urllib.request.Request(url, headers={"User-Agent": "darts-predictor/1.0"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        data = resp.read(MAX_DOWNLOAD + 1)
+    if len(data) > MAX_DOWNLOAD: raise ValueError(f"Image larger than {MAX_DOWNLOAD} bytes: {url}")
+    return data
+
+class ThumbnailCache:
+    def __init__(self, directory, base_url, max_bytes=50 * 1024 * 1024, size=THUMB_SIZE, fetcher=fetch, retry_after=600, memory=512):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        self.max_bytes = max_bytes
+        self.size = size
+        self.fetcher = fetcher
+        self.retry_after = retry_after
+        self.hits = self.misses = self.failures = 0
+        self._memory = OrderedDict()
+        self._memory_size = memory
+        self._failed = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._index_path = os.path.join(directory, "index.json")
+        try:
+            with open(self._index_path) as f: self._index = json.load(f)
+        except (OSError, ValueError): self._index = {}
+
+    def get(self, url):
+        """URL of url's thumbnail, fetched on first use; PLACEHOLDER if there is none."""
+        if not isinstance(url, str) or not url.startswith(("http://", "https://")): return PLACEHOLDER
+        with self._lock:
+            served = self._memory.get(url)
+            if served:
+                self._memory.move_to_end(url)
+                self.hits += 1
+                return served
+            failed = self._failed.get(url)
+            if failed and time.time() - failed < self.retry_after: return PLACEHOLDER
+            entry = self._index.get(url)
+        name = entry["file"] if entry and os.path.exists(os.path.join(self.directory, entry["file"])) else None
+        if name is None:
+            with self._lock: self.misses += 1
+            try: name = self._store(url, thumbnail(self.fetcher(url), self.size))
+            except Exception:
+                with self._lock:
+                    self.failures += 1
+                    self._failed[url] = time.time()
+                return PLACEHOLDER
+        served = f"{self.base_url}/{name}"
+        with self._lock:
+            if url in self._index: self._index[url]["used"] = time.time()
+            self._memory[url] = served
+            if len(self._memory) > self._memory_size: self._memory.popitem(last=False)
+        return served
+
+    def warm(self, urls, workers=8):
+        """Fetch every not-yet-cached url concurrently, so a page's first render waits once."""
+        todo = [u for u in dict.fromkeys(urls) if isinstance(u, str) and u not in self._memory]
+        if len(todo) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(todo))) as pool: list(pool.map(self.get, todo))
+        elif todo: self.get(todo[0])
+
+    def total_bytes(self):
+        with self._lock: return sum(e["bytes"] for e in {e["file"]: e for e in self._index.values()}.values())
+
+    def _store(self, url, data):
+        name = hashlib.sha256(data).hexdigest() + ".webp"
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f: f.write(data)
+            os.replace(tmp, path)
+        with self._lock:
+            self._index[url] = {"file": name, "bytes": len(data), "used": time.time()}
+            self._evict()
+            self._save_index()
+        return name
+
+    def _evict(self):
+        # Least recently used files first; a file goes once no URL that still maps to it is kept.
+        files = {}
+        for url, e in self._index.items():
+            f = files.setdefault(e["file"], {"bytes": e["bytes"], "used": 0, "urls": []})
+            f["used"] = max(f["used"], e["used"]); f["urls"].append(url)
+        total = sum(f["bytes"] for f in files.values())
+        for name, f in sorted(files.items(), key=lambda kv: kv[1]["used"]):
+            if total <= self.max_bytes or len(files) <= 1: break
+            for url in f["urls"]:
+                self._index.pop(url, None); self._memory.pop(url, None)
+            try: os.remove(os.path.join(self.directory, name))
+            except OSError: pass
+            total -= f["bytes"]; files.pop(name)
+
+    def _save_index(self):
+        tmp = f"{self._index_path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f: json.dump(self._index, f)
+        os.replace(tmp, self._index_path)
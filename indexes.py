@@ -0,0 +1,197 @@
+import difflib
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Lookup structures derived from the typed sheets. Each is built once per data
+# version through SheetCache.derived() and then only read, so page loops make
+# O(1) lookups instead of filtering whole frames on every rerun.
+
+class PredictionIndex:
+    """Resulted Match_IDs, plus each user's predicted Match_IDs with the score they picked.
+
+    Rows are grouped by user up front; a user's {Match_ID: Score} dict is only built the
+    first time that user is looked up."""
+    def __init__(self, predictions, results):
+        self.resulted = frozenset(results['Match_ID'].tolist()) if not results.empty else frozenset()
+        self.by_user = {}
+        if predictions.empty:
+            self._rows = {}
+            return
+        self._mids = predictions['Match_ID'].to_numpy()
+        self._scores = predictions['Score'].to_numpy()
+        self._rows = {str(u): rows for u, rows in predictions.groupby('Username', observed=True, sort=False).indices.items()}
+
+    def predicted(self, username):
+        if username not in self.by_user:
+            rows = self._rows.get(username, [])
+            # Later rows win, matching Rival Watch's drop_duplicates(keep='last').
+            self.by_user[username] = dict(zip(self._mids[rows].tolist(), self._scores[rows].tolist())) if len(rows) else {}
+        return self.by_user[username]
+
+class MatchPicks:
+    """Per-match view of Predictions for Rival Watch.
+
+    For every match: a histogram of the picked scores, the consensus pick, the split of
+    predicted winners, and everyone's pick ordered by current points so the top rivals come
+    first and any page of rows is a slice. One user's later prediction replaces an earlier one."""
+    def __init__(self, predictions, standings, points='Current Points'):
+        cols = ['Username', 'Match_ID', 'Score', 'Score_P1', 'Score_P2']
+        p = predictions[cols] if not predictions.empty and all(c in predictions.columns for c in cols) else pd.DataFrame(columns=cols)
+        p = p.astype({'Username': str}).drop_duplicates(['Username', 'Match_ID'], keep='last')
+        pts = standings.set_index(standings['Username'].astype(str))[points] if not standings.empty else pd.Series(dtype='int64')
+        # Picks are counted by their parsed score (unreadable ones only appear in the rows).
+        u1 = p['Score_P1'].to_numpy(dtype='int64', na_value=-1)
+        u2 = p['Score_P2'].to_numpy(dtype='int64', na_value=-1)
+        valid = (u1 >= 0) & (u2 >= 0)
+        p = p.assign(**{points: p['Username'].map(pd.to_numeric(pts, errors='coerce')).fillna(0).astype('int64'),
+                        'Pick': np.where(valid, u1 * 1000 + u2, -1), 'Winner': np.where(valid, np.sign(u1 - u2), 0)})
+        p = p.sort_values(['Match_ID', points, 'Username'], ascending=[True, False, True], kind='stable').reset_index(drop=True)
+        self.picks = p[['Username', 'Score', points]]
+        mids = p['Match_ID'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, mids[1:] != mids[:-1]]) if len(mids) else np.array([], dtype=int)
+        self._span = dict(zip(mids[starts].tolist(), zip(starts.tolist(), np.r_[starts[1:], len(p)].astype(int).tolist())))
+        hist = p[p['Pick'] >= 0].groupby(['Match_ID', 'Pick'], sort=False).size()
+        self._hist = {mid: g.droplevel(0).sort_values(ascending=False, kind='stable').rename(lambda c: f"{c // 1000}-{c % 1000}").rename_axis('Score')
+                      for mid, g in hist.groupby(level=0, sort=False)}
+        split = p.groupby(['Match_ID', 'Winner']).size()
+        self._split = {mid: {w: int(g.get((mid, w), 0)) for w in (1, -1, 0)} for mid, g in split.groupby(level=0)}
+
+    def count(self, mid):
+        start, stop = self._span.get(mid, (0, 0))
+        return stop - start
+
+    def histogram(self, mid):
+        """Score -> number of users who picked it, most popular first."""
+        return self._hist.get(mid, pd.Series(dtype='int64'))
+
+    def consensus(self, mid):
+        hist = self.histogram(mid)
+        return (hist.index[0], int(hist.iloc[0])) if len(hist) else (None, 0)
+
+    def outcomes(self, mid):
+        """{1: picked Player1, -1: picked Player2, 0: level or unreadable}"""
+        return self._split.get(mid, {1: 0, -1: 0, 0: 0})
+
+    def rows(self, mid, start=0, stop=None):
+        first, last = self._span.get(mid, (0, 0))
+        stop = last if stop is None else min(first + stop, last)
+        return self.picks.iloc[first + start:stop]
+
+class RankIndex:
+    """Standings sorted once, best first, with competition ranks (1, 2, 2, 4) like the history
+    snapshots and what-if tables. Any page of the table, or the rows around one user, is a slice,
+    so a leaderboard only renders the rows it shows. Ties are listed by Username."""
+    def __init__(self, standings, points='Current Points'):
+        self.points = points
+        if standings.empty or points not in standings.columns:
+            standings = pd.DataFrame(columns=['Username', points])
+        pts = pd.to_numeric(standings[points], errors='coerce').fillna(0).to_numpy(dtype='int64')
+        names = standings['Username'].astype(str).to_numpy()
+        order = np.lexsort((names, -pts))
+        pts = pts[order]
+        # A tied row takes the position of the first row with its points.
+        ranks = np.maximum.accumulate(np.where(np.r_[True, pts[1:] != pts[:-1]], np.arange(1, len(pts) + 1), 0)) if len(pts) else np.array([], dtype='int64')
+        self.table = standings.iloc[order].reset_index(drop=True).assign(**{points: pts})
+        self.table.insert(0, 'Rank', ranks)
+        self.usernames = names[order].tolist()
+        self._pos = {u: i for i, u in enumerate(self.usernames)}
+
+    def __len__(self):
+        return len(self.table)
+
+    def __contains__(self, username):
+        return username in self._pos
+
+    def rank(self, username):
+        pos = self._pos.get(username)
+        return None if pos is None else int(self.table['Rank'].iat[pos])
+
+    def rows(self, start=0, stop=None):
+        return self.table.iloc[start:stop]
+
+    def top(self, n):
+        return self.table.iloc[:n]
+
+    def around(self, username, k=5):
+        """The user's row with up to k rows either side of it; empty if the user is not ranked."""
+        pos = self._pos.get(username)
+        if pos is None: return self.table.iloc[:0]
+        return self.table.iloc[max(pos - k, 0):pos + k + 1]
+
+class StandingsHistory:
+    """Standings snapshots (see standings.py) grouped per user for the Leaderboard.
+
+    `movement` is each user's Movement in the latest snapshot; user() is one user's Points and
+    Rank per day, oldest first. `order` lists the days oldest first (default: sorted as text)."""
+    def __init__(self, history, order=None):
+        self.movement = {}
+        self._rows = {}
+        if history.empty: return
+        present = set(history['Day'].astype(str))
+        self.days = [d for d in (order if order is not None else sorted(present)) if d in present]
+        if not self.days: return
+        self._history = history.assign(Day=pd.Categorical(history['Day'].astype(str), categories=self.days, ordered=True))
+        latest = self._history[self._history['Day'] == self.days[-1]]
+        self.movement = dict(zip(latest['Username'].astype(str), latest['Movement'].astype(int)))
+        self._rows = {str(u): rows for u, rows in self._history.groupby('Username', observed=True, sort=False).indices.items()}
+
+    def user(self, username):
+        rows = self._rows.get(username)
+        if rows is None: return pd.DataFrame(columns=['Day', 'Points', 'Rank'])
+        return self._history.iloc[rows].sort_values('Day')[['Day', 'Points', 'Rank']].astype({'Day': str})
+
+def normalize_name(name):
+    text = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    return ' '.join(re.sub(r"[^a-z0-9 ]+", ' ', text.casefold()).split())
+
+class Player:
+    """One sheet row: `player[col]` is the value as shown, `player.num[col]` the parsed float."""
+    def __init__(self, name, row, num):
+        self.name = name
+        self.row = row
+        self.num = num
+
+    def __getitem__(self, col):
+        return self.row[col]
+
+class PlayerIndex:
+    """Player rows keyed by normalized name, with nickname/alias and fuzzy fallbacks.
+
+    Lookup order: exact normalized name, then an alias (the Nickname column, any
+    comma-separated Aliases column, and surnames that only one player has), then the
+    closest name by difflib ratio above `cutoff`. Substring matches are never used, so
+    one player's name inside another's cannot pick the wrong row."""
+    def __init__(self, df, name_col, numeric=(), cutoff=0.85):
+        self.players = {}
+        self.aliases = {}
+        self.cutoff = cutoff
+        if df.empty or name_col not in df.columns: return
+        nums = {c: pd.to_numeric(df[c].astype(str).str.replace(r"[%£,\s]", '', regex=True), errors='coerce').fillna(0.0).astype(float).tolist() for c in numeric if c in df.columns}
+        surnames = {}
+        for i, row in enumerate(df.to_dict('records')):
+            key = normalize_name(row[name_col])
+            if not key or key in self.players: continue
+            self.players[key] = Player(row[name_col], row, {c: v[i] for c, v in nums.items()})
+            extra = [row.get('Nickname')] + str(row.get('Aliases') or '').split(',')
+            for alias in map(normalize_name, (a for a in extra if a and not pd.isna(a))):
+                if alias: self.aliases.setdefault(alias, key)
+            surnames.setdefault(key.split()[-1], []).append(key)
+        for surname, keys in surnames.items():
+            if len(keys) == 1: self.aliases.setdefault(surname, keys[0])
+
+    def get(self, name):
+        key = normalize_name(name)
+        if key in self.players: return self.players[key]
+        if key in self.aliases: return self.players[self.aliases[key]]
+        close = difflib.get_close_matches(key, list(self.players), n=1, cutoff=self.cutoff)
+        if close:
+            self.aliases[key] = close[0]
+            return self.players[close[0]]
+        return None
+
+    def field(self, name, col, default=None):
+        player = self.get(name)
+        value = player.row.get(col) if player else None
+        return default if value is None or (not isinstance(value, str) and pd.isna(value)) else value
@@ -0,0 +1,62 @@
+"""Leagues as partitions of the per-user worksheets.
+
+Each user belongs to one league, named in the Users sheet's League column (blank means the
+default league). Leagues are open: there is no join code, so anyone who types a league's name at
+registration joins it. Predictions, Standings, Standings_History and Reminders in app.py, and
+User_Submissions, PL_Standings and PL_History in pl_darts_2026.py, are stored per league under storage.partition() names, so a
+league's pages only read and score its own rows. Matches, Results and the PL results are shared.
+Leagues never overlap, so anything global is the per-league tables put side by side."""
+import re
+import pandas as pd
+
+DEFAULT = ""
+
+def slug(name):
+    """League names as typed ("Office Darts!") -> partition key ("office-darts")."""
+    return re.sub(r"[^a-z0-9]+", "-", str(name).strip().lower()).strip("-")
+
+def label(league):
+    return league.replace("-", " ").title() if league else "Main League"
+
+# Names that would pass for the main league or the "All Leagues" view on the leaderboard.
+RESERVED = {"main", "main-league", "default", "all", "all-leagues"}
+
+def invalid(name):
+    """Why a league name typed at registration can't be used, or None (blank joins the main league)."""
+    if not str(name).strip(): return None
+    key = slug(name)
+    if not key: return "League names need a letter or number."
+    if key in RESERVED: return f"\"{label(key)}\" is reserved; pick another league name."
+    return None
+
+class Membership:
+    """Username -> league, and league -> members, from the typed Users sheet."""
+    def __init__(self, users):
+        if users.empty:
+            self.by_user, self.members = {}, {}
+            return
+        names = users['Username'].astype(str)
+        league = users['League'].fillna(DEFAULT).map(slug) if 'League' in users.columns else pd.Series(DEFAULT, index=users.index)
+        self.by_user = dict(zip(names, league))
+        self.members = {lg: list(g) for lg, g in names.groupby(league.to_numpy(), sort=True)}
+
+    def league(self, username):
+        return self.by_user.get(username, DEFAULT)
+
+    @property
+    def leagues(self):
+        # The default league is always there: it owns every sheet written before leagues existed.
+        return sorted(set(self.members) | {DEFAULT})
+
+    def select(self, users, league):
+        """Rows of `users` belonging to `league`."""
+        if users.empty: return users
+        return users[users['Username'].astype(str).isin(self.members.get(league, []))]
+
+def combine(partials, col):
+    """One global table from per-league standings {league: frame}, best first, with a League column."""
+    frames = [df.assign(League=label(lg)) for lg, df in partials.items() if not df.empty]
+    if not frames: return pd.DataFrame(columns=["Username", col, "League"])
+    out = pd.concat(frames, ignore_index=True)
+    out[col] = pd.to_numeric(out[col], errors='coerce').fillna(0).astype('int64')
+    return out.sort_values(col, ascending=False, kind='stable').reset_index(drop=True)
@@ -1,8 +1,15 @@
 import streamlit as st
-from streamlit_gsheets import GSheetsConnection
 import pandas as pd
 import time
 from datetime import datetime
+import scoring
+import standings
+import storage
+import indexes
+import leagues
+import auth
+import projections
+import runtime
 
 # 1. PAGE CONFIGURATION
 st.set_page_config(page_title="PL Predictor", page_icon="https://i.postimg.cc/8kr9Yqnx/darts-logo-big.png", layout="wide")
@@ -11,17 +18,25 @@ if 'username' not in st.session_state: st.session_state['username'] = ""
 if 'current_page' not in st.session_state: st.session_state['current_page'] = "Matches"
 if 'reg_mode' not in st.session_state: st.session_state['reg_mode'] = False
 
-conn = st.connection("gsheets", type=GSheetsConnection)
-URL = st.secrets["connections"]["gsheets"]["spreadsheet"]
+def scoring_rules():
+    # [pl_scoring] QF / SF / Final (or single rounds like QF1) and perfect in secrets.toml; unset rounds keep 2 / 3 / 5
+    try: config = dict(st.secrets.get("pl_scoring", {}))
+    except Exception: config = {}
+    return scoring.BracketRules.from_config(config)
 
-@st.cache_data(ttl=60)
-def get_data(worksheet):
-    try:
-        df = conn.read(spreadsheet=URL, worksheet=worksheet, ttl=0)
-        df = df.dropna(how='all').reset_index(drop=True)
-        df.columns = df.columns.str.strip()
-        return df
-    except: return pd.DataFrame()
+RULES = scoring_rules()
+
+# (ttl, stale-while-revalidate window) in seconds; anything not listed is (60, 0)
+SHEET_POLICIES = {"Players": (3600, 86400), "Stats": (3600, 86400), "PL_2026_Admin": (600, 3600), "Users": (60, 0)}
+
+# Recorder, backend, sheet cache and write queue live in runtime.py, shared with app.py.
+RT = runtime.App("pl", SHEET_POLICIES, (60, 0))
+get_recorder, get_backend, get_images = runtime.get_recorder, runtime.get_backend, runtime.get_images
+get_cache, get_writer, get_rejects = RT.cache, RT.writer, RT.rejects
+prefetch, get_data, get_derived, put_data, put_rows = RT.prefetch, RT.get_data, RT.get_derived, RT.put_data, RT.put_rows
+
+get_recorder().tally()
+rerun_span = get_recorder().span("rerun", "pl_darts_2026.py")
 
 # 2. THEMED CSS
 st.markdown("""
@@ -46,6 +61,7 @@ st.markdown("""
     }
     .leaderboard-ui th { background-color: #C4B454; color: black; padding: 15px; text-align: left; font-weight: 900; }
     .leaderboard-ui td { padding: 15px; border-bottom: 1px solid #333; color: white; }
+    .leaderboard-ui tr.me td { color: #C4B454; font-weight: 900; }
     div.stButton > button {
         background-color: #C4B454 !important; color: black !important;
         font-weight: 700 !important; text-transform: uppercase; width: 100% !important;
@@ -64,34 +80,48 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # 3. SCORING ENGINE & COUNTDOWN
-def calculate_leaderboard():
-    subs = get_data("User_Submissions")
-    results = get_data("PL_Results")
-    users = get_data("Users")
+def calculate_leaderboard(league):
+    # User_Submissions and PL_Standings are stored per league (see leagues.py)
+    users = get_derived("leagues", ("Users",), leagues.Membership).select(get_data("Users"), league)
     if users.empty: return pd.DataFrame(columns=["Username", "Total"])
-    scores = {str(user): 0 for user in users['Username'].unique()}
-    if not subs.empty and not results.empty:
-        for _, res_row in results.iterrows():
-            night = res_row['Night']
-            night_subs = subs[subs['Night'] == night]
-            for _, sub_row in night_subs.iterrows():
-                u = str(sub_row['Username'])
-                if u in scores:
-                    pts = 0
-                    if sub_row['QF1'] == res_row['QF1']: pts += 2
-                    if sub_row['QF2'] == res_row['QF2']: pts += 2
-                    if sub_row['QF3'] == res_row['QF3']: pts += 2
-                    if sub_row['QF4'] == res_row['QF4']: pts += 2
-                    if sub_row['SF1'] == res_row['SF1']: pts += 3
-                    if sub_row['SF2'] == res_row['SF2']: pts += 3
-                    if sub_row['Final'] == res_row['Final']: pts += 5
-                    scores[u] += pts
-    lb = pd.DataFrame(list(scores.items()), columns=["Username", "Total"])
-    return lb.sort_values(by="Total", ascending=False)
-
-def get_countdown(target_date_str):
+    lb = get_data(storage.partition("PL_Standings", league))
+    if lb.empty:
+        with get_recorder().span("compute", "pl_leaderboard", league=league):
+            lb = scoring.pl_leaderboard(users, get_data(storage.partition("User_Submissions", league)), get_data("PL_Results"), RULES)
+        try:
+            # Never persist standings built from snapshot data that has not synced yet.
+            if not get_cache().syncing("Users", storage.partition("PL_Standings", league), storage.partition("User_Submissions", league), "PL_Results"):
+                put_data(storage.partition("PL_Standings", league), lb)
+        except: pass
+    return standings.with_users(lb, users, "Total")
+
+def get_ranks(league=None):
+    # The Leaderboard's RankIndex for one league, or all of them (None), built once per version of Users and PL_Standings
+    membership = get_derived("leagues", ("Users",), leagues.Membership)
+    lgs = membership.leagues if league is None else [league]
+    parts = [storage.partition("PL_Standings", lg) for lg in lgs]
+    # league is "" for the default league, so only None means all of them.
+    def build(tables): return indexes.RankIndex(leagues.combine(tables, "Total") if league is None else tables[league], "Total")
+    # Standings not built yet: calculate_leaderboard rebuilds (and saves) them.
+    if any(get_data(p).empty for p in parts): return build({lg: calculate_leaderboard(lg) for lg in lgs})
+    return get_derived("ranks:all" if league is None else f"ranks@{leagues.slug(league)}", ("Users", *parts), lambda users, *lbs: build({lg: standings.with_users(lb, membership.select(users, lg), "Total") for lg, lb in zip(lgs, lbs)}))
+
+def get_projection(league):
+    # Title odds: the remaining nights simulated once per version of the sheets they read (see projections.py)
+    def build(users, subs, results, admin, stats):
+        with get_recorder().span("compute", "projection", league=league):
+            lb = scoring.pl_leaderboard(get_derived("leagues", ("Users",), leagues.Membership).select(users, league), subs, results, RULES)
+            return projections.project_nights(lb, admin, subs, results, stats, RULES)
+    return get_derived(f"projection@{league}", ("Users", storage.partition("User_Submissions", league), "PL_Results", "PL_2026_Admin", "Stats"), build)
+
+def page_plan(page, league):
+    """Worksheets a page reads, fetched together before it renders; every page shows players and nights."""
+    part = lambda ws: storage.partition(ws, league)
+    return ["Players", "PL_2026_Admin"] + {"Matches": [part("User_Submissions")],
+                                           "Leaderboard": ["Users", part("PL_Standings"), part("PL_History"), part("User_Submissions"), "PL_Results"]}.get(page, [])
+
+def get_countdown(target_date):
     try:
-        target_date = pd.to_datetime(target_date_str)
         now = datetime.now()
         diff = target_date - now
         if diff.total_seconds() > 0:
@@ -109,9 +139,9 @@ def get_countdown(target_date_str):
     return "<h3 style='text-align:center; color:#C4B454;'>⛔️ ENTRIES CLOSED</h3>"
 
 # 4. HELPERS
-def render_match(p1, p2, key, img_lookup, disabled=False):
-    img1 = img_lookup.get(p1, "https://via.placeholder.com/150")
-    img2 = img_lookup.get(p2, "https://via.placeholder.com/150")
+def render_match(p1, p2, key, players, disabled=False):
+    img1 = get_images().get(players.field(p1, 'Image_URL'))
+    img2 = get_images().get(players.field(p2, 'Image_URL'))
     st.markdown(f"""
         <div style="border: 1px solid #C4B454; border-radius: 12px; background: rgba(20, 20, 20, 0.95); padding: 15px; margin-bottom: 10px;">
             <div style="display: flex; justify-content: space-around; align-items: center;">
@@ -123,18 +153,63 @@ def render_match(p1, p2, key, img_lookup, disabled=False):
     """, unsafe_allow_html=True)
     return st.selectbox(f"Winner", ["Select Winner", p1, p2], key=key, label_visibility="collapsed", disabled=disabled)
 
+# The countdown and the bracket are fragments: the countdown ticks on its own, and each pick in
+# the QF -> SF -> Final cascade reruns only the bracket, not the whole script.
+@st.fragment(run_every=30)
+def countdown(cutoff):
+    st.markdown(get_countdown(cutoff), unsafe_allow_html=True)
+
+def submit_bracket(league, row):
+    # Button callback: runs before the bracket reruns, so it comes back already locked.
+    try: msg = "Good luck!" if get_writer().submit(storage.partition("User_Submissions", league), {"Timestamp": datetime.now(), **row}) else "Already submitted for this night."
+    except Exception as e: msg = f"⚠️ Not saved, please try again: {e}"
+    # Callbacks cannot draw inside a fragment; the bracket shows the message when it reruns.
+    st.session_state['bracket_msg'] = msg
+
+@st.fragment
+def bracket(night, n_data, league):
+    span = get_recorder().span("fragment", "bracket")
+    msg = st.session_state.pop('bracket_msg', None)
+    if msg: st.toast(msg)
+    players = get_derived("player_index", ("Players",), lambda df: indexes.PlayerIndex(df, "Name"))
+    submitted = get_derived(f"submitted@{league}", (storage.partition("User_Submissions", league),), lambda df: set(zip(df['Username'].astype(str), df['Night'].astype(str))) if not df.empty else set())
+    done = (st.session_state['username'], str(night)) in submitted
+    # The night's photos are fetched together once; after that every card reads local thumbnails.
+    get_images().warm(players.field(n_data[f'QF{i}-P{j}'], 'Image_URL') for i in range(1, 5) for j in (1, 2))
+    st.write("### Quarter Finals")
+    q1 = render_match(n_data['QF1-P1'], n_data['QF1-P2'], "q1", players, done)
+    q2 = render_match(n_data['QF2-P1'], n_data['QF2-P2'], "q2", players, done)
+    q3 = render_match(n_data['QF3-P1'], n_data['QF3-P2'], "q3", players, done)
+    q4 = render_match(n_data['QF4-P1'], n_data['QF4-P2'], "q4", players, done)
+    if all(x != "Select Winner" for x in [q1, q2, q3, q4]):
+        st.divider(); st.write("### Semi Finals")
+        s1 = render_match(q1, q2, "s1", players, done)
+        s2 = render_match(q3, q4, "s2", players, done)
+        if all(x != "Select Winner" for x in [s1, s2]):
+            st.divider(); st.write("### The Final")
+            fin = render_match(s1, s2, "fin", players, done)
+            if fin != "Select Winner" and not done:
+                st.button("SUBMIT PREDICTIONS", on_click=submit_bracket, args=(league, {"Username": st.session_state['username'], "Night": night, "QF1": q1, "QF2": q2, "QF3": q3, "QF4": q4, "SF1": s1, "SF2": s2, "Final": fin}))
+    if done: st.info("Predictions locked for this night.")
+    span.end(night=night)
+
 # 5. SIDEBAR
 with st.sidebar:
     st.image("https://i.postimg.cc/8kr9Yqnx/darts-logo-big.png", width='stretch')
     st.markdown("<h1 style='text-align: center; font-size: 1.5rem;'>MATCH PREDICTOR</h1>", unsafe_allow_html=True)
+    if get_cache().syncing(): st.caption(f"🕒 Data as of {get_cache().as_of():%d %b %H:%M}, syncing…" if get_cache().as_of() else "🕒 Syncing…")
     
     if st.session_state['username'] == "":
         if not st.session_state['reg_mode']:
             u_in = st.text_input("Username")
             p_in = st.text_input("Password", type="password")
             if st.button("LOGIN"):
-                udf = get_data("Users")
-                if not udf[(udf['Username'].astype(str)==str(u_in)) & (udf['Password'].astype(str)==str(p_in))].empty:
+                users = get_derived("user_index", ("Users",), auth.UserIndex)
+                if users.verify(u_in, p_in):
+                    # Plaintext passwords from before hashing are replaced on their first login.
+                    if auth.needs_rehash(users.password(u_in)):
+                        try: put_rows("Users", pd.DataFrame([{**users.row(u_in), "Password": auth.hash_password(p_in)}]), ["Username"])
+                        except: pass
                     st.session_state['username'] = u_in; st.rerun()
                 else: st.error("Invalid Login")
             
@@ -144,16 +219,16 @@ with st.sidebar:
             st.markdown("### Register")
             new_u = st.text_input("New Username")
             new_p = st.text_input("New Password", type="password")
+            new_l = st.text_input("League (Optional)", help="Anyone who enters the same name joins the same league; leave blank for the main league.")
             if st.button("SUBMIT REGISTRATION"):
-                udf = get_data("Users")
-                if new_u in udf['Username'].astype(str).values:
+                if new_u in get_derived("user_index", ("Users",), auth.UserIndex):
                     st.error("Username already exists!")
+                elif leagues.invalid(new_l): st.error(leagues.invalid(new_l))
                 elif new_u and new_p:
-                    new_user_df = pd.DataFrame([{"Username": new_u, "Password": new_p}])
-                    conn.update(spreadsheet=URL, worksheet="Users", data=pd.concat([udf, new_user_df]))
-                    st.cache_data.clear()
-                    st.success("Account Created! Please Login.")
-                    st.session_state['reg_mode'] = False; time.sleep(1); st.rerun()
+                    if get_writer().submit("Users", {"Username": new_u, "Password": auth.hash_password(new_p), "League": leagues.slug(new_l)}):
+                        st.success("Account Created! Please Login.")
+                        st.session_state['reg_mode'] = False; time.sleep(1); st.rerun()
+                    else: st.error("Username already exists!")
                 else: st.warning("Please fill in both fields.")
             
             if st.button("BACK TO LOGIN"):
@@ -168,10 +243,14 @@ with st.sidebar:
             st.session_state['username'] = ""; st.session_state['current_page'] = "Matches"; st.rerun()
 
 # 6. MAIN CONTENT
+LEADERBOARD_PER_PAGE = 50
+LEADERBOARD_AROUND = 5
 if st.session_state['username'] != "":
-    players_df = get_data("Players")
-    img_lookup = dict(zip(players_df['Name'], players_df['Image_URL'])) if not players_df.empty else {}
+    members = get_derived("leagues", ("Users",), leagues.Membership)
+    league = members.league(st.session_state['username'])
+    prefetch(st.session_state['current_page'], page_plan(st.session_state['current_page'], league))
     admin_df = get_data("PL_2026_Admin")
+    page_span = get_recorder().span("page", st.session_state['current_page'])
 
     if st.session_state['current_page'] == "Matches":
         if not admin_df.empty:
@@ -179,42 +258,55 @@ if st.session_state['username'] != "":
             n_data = admin_df[admin_df['Night'] == night].iloc[0]
             st.markdown(f"<h1 style='text-align: center;'>{night}</h1>", unsafe_allow_html=True)
             st.markdown(f"<h3 style='text-align: center;'>{n_data['Venue']}</h3>", unsafe_allow_html=True)
-            st.markdown(get_countdown(n_data['Cutoff']), unsafe_allow_html=True)
-            subs_df = get_data("User_Submissions")
-            done = not subs_df[(subs_df['Username'] == st.session_state['username']) & (subs_df['Night'] == night)].empty
-            st.write("### Quarter Finals")
-            q1 = render_match(n_data['QF1-P1'], n_data['QF1-P2'], "q1", img_lookup, done)
-            q2 = render_match(n_data['QF2-P1'], n_data['QF2-P2'], "q2", img_lookup, done)
-            q3 = render_match(n_data['QF3-P1'], n_data['QF3-P2'], "q3", img_lookup, done)
-            q4 = render_match(n_data['QF4-P1'], n_data['QF4-P2'], "q4", img_lookup, done)
-            if all(x != "Select Winner" for x in [q1, q2, q3, q4]):
-                st.divider(); st.write("### Semi Finals")
-                s1 = render_match(q1, q2, "s1", img_lookup, done)
-                s2 = render_match(q3, q4, "s2", img_lookup, done)
-                if all(x != "Select Winner" for x in [s1, s2]):
-                    st.divider(); st.write("### The Final")
-                    fin = render_match(s1, s2, "fin", img_lookup, done)
-                    if fin != "Select Winner" and not done:
-                        if st.button("SUBMIT PREDICTIONS"):
-                            new_row = pd.DataFrame([{"Timestamp": datetime.now(), "Username": st.session_state['username'], "Night": night, "QF1": q1, "QF2": q2, "QF3": q3, "QF4": q4, "SF1": s1, "SF2": s2, "Final": fin}])
-                            conn.update(spreadsheet=URL, worksheet="User_Submissions", data=pd.concat([subs_df, new_row]))
-                            st.cache_data.clear(); st.success("Good luck!"); time.sleep(1); st.rerun()
-            if done: st.info("Predictions locked for this night.")
+            countdown(n_data['Cutoff'])
+            bracket(night, n_data, league)
 
     elif st.session_state['current_page'] == "Leaderboard":
         st.markdown("<h1 style='text-align: center;'>🏆 LEADERBOARD</h1>", unsafe_allow_html=True)
-        lb_df = calculate_leaderboard()
-        if not lb_df.empty:
-            html = "<table class='leaderboard-ui'><tr><th>Rank</th><th>Player</th><th>Points</th></tr>"
-            for i, row in enumerate(lb_df.itertuples(), 1):
-                html += f"<tr><td>{i}</td><td>{row.Username}</td><td>{int(row.Total)}</td></tr>"
-            st.markdown(html + "</table>", unsafe_allow_html=True)
+        scope = st.radio("Show", [leagues.label(league), "All Leagues"], horizontal=True, label_visibility="collapsed") if len(members.leagues) > 1 else None
+        ranks = get_ranks(None if scope == "All Leagues" else league)
+        # Movement and history come from the per-night snapshots; nothing is replayed here.
+        hist = get_derived(f"history@{league}", (storage.partition("PL_History", league), "PL_2026_Admin"), lambda h, a: indexes.StandingsHistory(h, a['Night'].astype(str).tolist() if not a.empty else None))
+        moves = hist.movement if scope != "All Leagues" else {}
+        me = st.session_state['username']
+        if len(ranks):
+            # Only one window of the table becomes HTML: a page from the top, or the rows around you.
+            view = st.radio("View", ["Top", "Around me"], horizontal=True) if me in ranks else "Top"
+            if view == "Around me": window = ranks.around(me, LEADERBOARD_AROUND)
+            else:
+                pages = -(-len(ranks) // LEADERBOARD_PER_PAGE)
+                pg = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+                window = ranks.rows((pg - 1) * LEADERBOARD_PER_PAGE, pg * LEADERBOARD_PER_PAGE)
+            # Off by default: the first look after new results runs the simulation.
+            odds = get_projection(league) if scope != "All Leagues" and st.toggle("🔮 Title odds", help="Plays out the remaining nights many times, using the players' stats and everyone's brackets") else None
+            odds = odds if odds is not None and len(odds) else None
+            share = odds.table().set_index('Username') if odds else None
+            extra = lambda u: (f"<td>{share.at[u, 'Win %']:.1f}%</td><td>{share.at[u, 'Top 3 %']:.1f}%</td>" if u in share.index else "<td></td><td></td>") if odds else ""
+            rows = "".join(f"<tr class='{'me' if str(row.Username) == me else ''}'><td>{row.Rank}</td><td>{row.Username}</td><td>{int(row.Total)}</td>{extra(str(row.Username))}<td>{standings.arrow(moves.get(str(row.Username), 0)) if moves else ''}</td></tr>"
+                           for row in window.itertuples())
+            head = "<th>Win</th><th>Top 3</th>" if odds else ""
+            st.markdown(f"<table class='leaderboard-ui'><tr><th>Rank</th><th>Player</th><th>Points</th>{head}<th></th></tr>{rows}</table>", unsafe_allow_html=True)
+            if me in ranks: st.caption(f"You are ranked #{ranks.rank(me)} of {len(ranks)}")
+            if odds:
+                st.caption(f"🔮 {odds.seasons:,} simulated seasons of the {odds.events} night(s) still to play; brackets not submitted yet score nothing.")
+                names = window['Username'].astype(str).tolist()
+                who = st.selectbox("🔮 Finishing positions for", names, index=names.index(me) if me in names else 0, key="odds_who")
+                st.bar_chart(odds.distribution(who), x_label="Finish", y_label="% of seasons", sort=False)
+            if moves:
+                names = window['Username'].astype(str).tolist()
+                who = st.selectbox("📈 History for", names, index=names.index(me) if me in names else 0)
+                h = hist.user(who).set_index('Day')
+                if h.empty: st.info(f"No history for {who} yet.")
+                else:
+                    c1, c2 = st.columns(2)
+                    with c1: st.caption("Points"); st.line_chart(h['Points'])
+                    with c2: st.caption("Rank (1 = top)"); st.line_chart(h['Rank'])
         else: st.info("No scores calculated yet.")
 
     elif st.session_state['current_page'] == "Admin":
         st.title("⚙︎ Admin Panel")
-        res_df = get_data("PL_Results")
         target = st.selectbox("Select Night to Update", admin_df['Night'].unique())
+        nights = admin_df['Night'].astype(str).tolist()
         td = admin_df[admin_df['Night'] == target].iloc[0]
         aq1 = st.selectbox("QF1 Winner", ["Select Winner", td['QF1-P1'], td['QF1-P2']], key="aq1")
         aq2 = st.selectbox("QF2 Winner", ["Select Winner", td['QF2-P1'], td['QF2-P2']], key="aq2")
@@ -226,12 +318,75 @@ if st.session_state['username'] != "":
         if st.button("SAVE OFFICIAL RESULTS"):
             if "Select Winner" in [aq1, aq2, aq3, aq4, as1, as2, afn]: st.error("Please select all winners.")
             else:
-                res_df = res_df[res_df['Night'].astype(str) != str(target)]
+                get_cache().invalidate("PL_Results", *[storage.partition(ws, lg) for lg in members.leagues for ws in ("PL_Standings", "PL_History")]); res_df = get_data("PL_Results")
+                prev = res_df[res_df['Night'] == target] if not res_df.empty else res_df
                 new_res = pd.DataFrame([{"Night": target, "QF1": aq1, "QF2": aq2, "QF3": aq3, "QF4": aq4, "SF1": as1, "SF2": as2, "Final": afn}])
-                conn.update(spreadsheet=URL, worksheet="PL_Results", data=pd.concat([res_df, new_res]).reset_index(drop=True))
-                st.cache_data.clear(); st.success("Scores updated!"); time.sleep(1); st.rerun()
+                res_df = pd.concat([res_df.drop(prev.index), new_res]).reset_index(drop=True)
+                put_rows("PL_Results", new_res, ["Night"])
+                # Only this night moves each league's table; re-saving a night reverses its old points first.
+                # The results are already saved, so a failed table update is reported for a rebuild instead of crashing.
+                failed = []
+                for lg in members.leagues:
+                    try:
+                        subs = get_data(storage.partition("User_Submissions", lg))
+                        if subs.empty: continue
+                        lb = get_data(storage.partition("PL_Standings", lg))
+                        if lb.empty: lb = scoring.pl_leaderboard(members.select(get_data("Users"), lg), subs, res_df, RULES)
+                        else: lb = standings.apply_delta(lb, standings.night_delta(subs, new_res, prev, RULES), "Total")
+                        put_data(storage.partition("PL_Standings", lg), lb)
+                        # Each saved night is a complete "day": snapshot it on top of the previous night's,
+                        # then carry the change through any later nights already snapshotted.
+                        hist = storage.partition("PL_History", lg)
+                        put_rows(hist, standings.rechain(get_data(hist), target, standings.night_delta(subs, new_res, rules=RULES), nights), ["Day"])
+                    except Exception as e: failed.append(f"{leagues.label(lg)}: {e}")
+                if failed: st.warning("Results saved, but standings were not updated for " + "; ".join(failed) + ". Run REBUILD STANDINGS once fixed."); st.stop()
+                st.success("Scores updated!"); time.sleep(1); st.rerun()
+        if st.button("REBUILD STANDINGS"):
+            get_cache().invalidate("PL_Results", *[storage.partition(ws, lg) for lg in members.leagues for ws in ("PL_Standings", "PL_History")])
+            fixed, results = 0, get_data("PL_Results")
+            for lg in members.leagues:
+                subs = get_data(storage.partition("User_Submissions", lg))
+                rebuilt = scoring.pl_leaderboard(members.select(get_data("Users"), lg), subs, results, RULES)
+                diff = standings.compare(get_data(storage.partition("PL_Standings", lg)), rebuilt, "Total")
+                put_data(storage.partition("PL_Standings", lg), rebuilt)
+                if not subs.empty and not results.empty:
+                    scored = scoring.score_pl_submissions(subs, results, RULES)
+                    done = set(results['Night'].astype(str))
+                    put_data(storage.partition("PL_History", lg), standings.replay(standings.day_deltas(scored, scored['Night'].astype(str), [n for n in nights if n in done])))
+                if not diff.empty: st.dataframe(diff.assign(League=leagues.label(lg)), hide_index=True); fixed += len(diff)
+            if not fixed: st.success("Standings verified.")
+            else: st.warning(f"Standings rebuilt, {fixed} users corrected.")
+        with st.expander("What-if Scoring"):
+            # Rescores every night from the scored brackets kept per data version; nothing is written.
+            st.caption(f"Live rules: {RULES}. To adopt new ones, set them under [pl_scoring] in secrets.toml, then REBUILD STANDINGS.")
+            cols = st.columns(4)
+            alt = scoring.BracketRules({r: RULES.rounds[r] for r in RULES.rounds}, RULES.perfect)
+            for col, (label, rounds) in zip(cols, (("QF", ["QF1", "QF2", "QF3", "QF4"]), ("SF", ["SF1", "SF2"]), ("Final", ["Final"]))):
+                pts = int(col.number_input(label, min_value=0, max_value=50, value=RULES.rounds[rounds[0]], key=f"wi_{label}"))
+                alt.rounds.update(dict.fromkeys(rounds, pts))
+            alt.perfect = int(cols[3].number_input("Perfect night", min_value=0, max_value=50, value=RULES.perfect, key="wi_perfect"))
+            wl = st.selectbox("League", members.leagues, format_func=leagues.label, key="wi_league") if len(members.leagues) > 1 else leagues.DEFAULT
+            scored = get_derived(f"scored@{wl}@{RULES}", (storage.partition("User_Submissions", wl), "PL_Results"), lambda subs, res: scoring.score_pl_submissions(subs, res, RULES) if not subs.empty and not res.empty else None)
+            if scored is None or scored.empty: st.info("Nothing scored yet.")
+            else:
+                start = time.perf_counter(); wi = scoring.what_if(scored, alt)
+                st.caption(f"{len(scored):,} brackets rescored in {(time.perf_counter() - start) * 1000:.0f} ms; {int((wi['Moved'] != 0).sum())} users change rank.")
+                st.dataframe(wi.head(LEADERBOARD_PER_PAGE), hide_index=True, width='stretch')
+        rejects = {ws: df for ws, df in get_rejects().items() if not df.empty}
+        with st.expander(f"Data Validation ({sum(len(df) for df in rejects.values())} rejected cells)"):
+            for ws, df in rejects.items():
+                st.write(f"**{ws}**"); st.dataframe(df, hide_index=True, width='stretch')
+        with st.expander("Sheet Cache"):
+            st.dataframe(get_cache().stats(), hide_index=True, width='stretch')
+        with st.expander("Diagnostics"):
+            st.caption("Latency percentiles (ms) over the last {} events".format(len(get_recorder().events)))
+            st.dataframe(get_recorder().percentiles(), hide_index=True, width='stretch')
+            st.dataframe(get_recorder().counts(), hide_index=True, width='stretch')
+    page_span.end()
 else:
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2: st.image("https://i.postimg.cc/8kr9Yqnx/darts-logo-big.png", width='stretch')
     st.markdown("<h1 style='text-align: center; margin-top: -20px;'>WELCOME</h1>", unsafe_allow_html=True)
     st.markdown("<p style='text-align: center;'>Please login in the sidebar to view matches and enter predictions.</p>", unsafe_allow_html=True)
+
+rerun_span.end(page=st.session_state['current_page'], **get_recorder().tally())
@@ -0,0 +1,215 @@
+"""Monte Carlo title odds for both games: where does everyone finish if the rest of the season is played out?
+
+Every unplayed match (app.py) or night (pl_darts_2026.py) is one event with a small, fully enumerated
+outcome space: the possible scorelines of a race to N legs, or the 128 ways a QF -> SF -> Final
+bracket can go. Each outcome's probability comes from the players' Stats ratings, and each user's
+points for it from their existing pick under the league's scoring rules, so an event is a
+probability vector plus a (outcomes x users) points table. Seasons are then simulated in batches:
+one draw per event per season, a row gather per event, and one sort per batch to rank everyone.
+Nobody's missing picks are guessed: a user without a pick scores nothing from that event."""
+from math import comb
+import numpy as np
+import pandas as pd
+import indexes
+import scoring
+
+SEASONS = 100_000
+SEED = 2026
+MAX_WORK = 2_000_000_000   # seasons x users x (events + RANK_COST); big leagues simulate fewer seasons
+RANK_COST = 25             # ranking a season costs about as much as this many events
+BATCH_CELLS = 4_000_000    # seasons x users held in memory at once
+LEGS = 6                   # race length when Results does not show one
+PL_LEGS = 6
+# Stats columns behind a player's rating, as weights on their z-scores across the Stats sheet.
+STRENGTH = {"Season Win %": 1.0, "Highest Average": 1.0, "Checkout %": 0.5}
+LEG_SLOPE = 0.5            # one rating point = logit(leg win) + 0.5, ~62% of legs
+EXACT_POSITIONS = 10       # positions 1..10 are counted one by one, lower ones in widening bands
+
+class Ratings:
+    """Player name -> rating (0 = Stats average, also used for unknown players), looked up like the H2H dialog."""
+    def __init__(self, stats, name_col="Player Name"):
+        self.players = indexes.PlayerIndex(stats, name_col, list(STRENGTH))
+        if not self.players.players:
+            self._ratings = {}
+            return
+        cols = [c for c in STRENGTH if c in stats.columns]
+        nums = pd.DataFrame([p.num for p in self.players.players.values()], index=list(self.players.players), columns=cols, dtype=float)
+        z = (nums - nums.mean()) / nums.std(ddof=0).replace(0, np.nan)
+        weights = pd.Series({c: STRENGTH[c] for c in cols})
+        self._ratings = (z.fillna(0.0) @ weights / (weights.sum() or 1.0)).to_dict() if cols else {}
+
+    def rating(self, name):
+        player = self.players.get(name) if name is not None and not pd.isna(name) else None
+        return self._ratings.get(indexes.normalize_name(player.name), 0.0) if player else 0.0
+
+    def leg(self, p1, p2):
+        """Chance p1 wins any one leg against p2."""
+        return 1.0 / (1.0 + np.exp(-LEG_SLOPE * (self.rating(p1) - self.rating(p2))))
+
+def race(p, legs):
+    """Scorelines of a race to `legs` where player 1 wins each leg with chance p: (scores (K, 2), probs (K,))."""
+    k = np.arange(legs)
+    ways = np.array([comb(legs - 1 + i, i) for i in k], dtype=float)
+    scores = np.r_[np.column_stack([np.full(legs, legs), k]), np.column_stack([k, np.full(legs, legs)])]
+    probs = np.r_[ways * p ** legs * (1 - p) ** k, ways * (1 - p) ** legs * p ** k]
+    return scores, probs / probs.sum()
+
+def race_length(results):
+    """The usual winning score in Results (6 in "6-4"), or LEGS if there is none."""
+    if results.empty or 'Score_P1' not in results.columns: return LEGS
+    best = pd.concat([results['Score_P1'], results['Score_P2']], axis=1).max(axis=1).dropna()
+    best = best[best > 0]
+    return int(best.mode().iloc[0]) if len(best) else LEGS
+
+def _users(standings, points, *frames):
+    lb = standings[['Username', points]].astype({'Username': str}).drop_duplicates('Username') if not standings.empty else pd.DataFrame(columns=['Username', points])
+    names = pd.unique(pd.concat([lb['Username']] + [f['Username'].astype(str) for f in frames if not f.empty]))
+    current = pd.to_numeric(pd.Series(names).map(lb.set_index('Username')[points]), errors='coerce').fillna(0).to_numpy(dtype=np.int32)
+    return list(names), current
+
+def _points_table(pts):
+    return pts.astype(np.int16 if np.abs(pts).max(initial=0) < 2 ** 15 else np.int32)
+
+def match_events(matches, predictions, results, ratings, usernames, rules=None):
+    """One (probs, outcomes x users points) event per match without a result."""
+    rules, legs = rules or scoring.MATCH_RULES, race_length(results)
+    done = set(results['Match_ID'].tolist()) if not results.empty else set()
+    todo = matches.dropna(subset=['Match_ID', 'Player1', 'Player2']).drop_duplicates('Match_ID') if not matches.empty else matches
+    todo = todo[~todo['Match_ID'].isin(done)] if not todo.empty else todo
+    if todo.empty: return []
+    col = {int(m): i for i, m in enumerate(todo['Match_ID'])}
+    row = {u: i for i, u in enumerate(usernames)}
+    u1 = np.zeros((len(col), len(usernames)), dtype=np.int32); u2 = u1.copy(); valid = np.zeros(u1.shape, dtype=bool)
+    if not predictions.empty:
+        p = predictions[predictions['Match_ID'].isin(col)].astype({'Username': str}).drop_duplicates(['Username', 'Match_ID'], keep='last')
+        p = p[p['Username'].isin(row) & p['Score_P1'].notna() & p['Score_P2'].notna()]
+        m, u = p['Match_ID'].map(col).to_numpy(dtype=int), p['Username'].map(row).to_numpy(dtype=int)
+        u1[m, u], u2[m, u], valid[m, u] = p['Score_P1'].to_numpy(dtype=np.int32), p['Score_P2'].to_numpy(dtype=np.int32), True
+    events = []
+    for i, (a, b) in enumerate(zip(todo['Player1'], todo['Player2'])):
+        scores, probs = race(ratings.leg(a, b), legs)
+        r1, r2 = scores[:, :1], scores[:, 1:]
+        events.append((probs, _points_table(rules.match_points(u1[i], u2[i], r1, r2, valid[i]))))
+    return events
+
+# Bracket outcome k: bit 0-3 = QF1-4 won by player 2, bit 4-5 = SF1-2 won by the lower QF's winner, bit 6 = Final won by SF2's winner.
+def _brackets():
+    bits = (np.arange(128)[:, None] >> np.arange(7)) & 1
+    qf = np.arange(4) * 2 + bits[:, :4]                               # index into the night's 8 players
+    sf = np.column_stack([qf[np.arange(128), 2 * i + bits[:, 4 + i]] for i in range(2)])
+    final = sf[np.arange(128), bits[:, 6]]
+    return np.column_stack([qf, sf, final]), bits
+
+BRACKETS, BRACKET_BITS = _brackets()
+
+def bracket_probs(players, ratings, legs=PL_LEGS):
+    """Chance of each of the 128 brackets for a night's 8 players (QF1-P1, QF1-P2, ..., QF4-P2)."""
+    win = np.array([[1.0 - race(ratings.leg(a, b), legs)[1][legs:].sum() for b in players] for a in players])
+    probs = np.ones(128)
+    for i in range(4): probs *= np.where(BRACKET_BITS[:, i], 1 - win[2 * i, 2 * i + 1], win[2 * i, 2 * i + 1])
+    for i, (a, b) in enumerate(((0, 1), (2, 3))):
+        first, second = BRACKETS[:, a], BRACKETS[:, b]
+        probs *= np.where(BRACKET_BITS[:, 4 + i], win[second, first], win[first, second])
+    probs *= np.where(BRACKET_BITS[:, 6], win[BRACKETS[:, 5], BRACKETS[:, 4]], win[BRACKETS[:, 4], BRACKETS[:, 5]])
+    return probs / probs.sum()
+
+def night_events(admin, subs, results, ratings, usernames, rules=None):
+    """One (probs, brackets x users points) event per PL_2026_Admin night without a PL_Results row."""
+    rules = rules or scoring.BRACKET_RULES
+    done = set(results['Night'].astype(str)) if not results.empty else set()
+    slots = [f"QF{i}-P{j}" for i in range(1, 5) for j in (1, 2)]
+    if admin.empty or not all(s in admin.columns for s in slots): return []
+    nights = admin[~admin['Night'].astype(str).isin(done)].dropna(subset=slots).drop_duplicates('Night')
+    row = {u: i for i, u in enumerate(usernames)}
+    weights = np.fromiter(rules.rounds.values(), dtype=np.int32)
+    events = []
+    for night in nights.to_dict('records'):
+        players = [str(night[s]).strip() for s in slots]
+        picks = np.full((len(usernames), len(rules.rounds)), -1)
+        mine = subs[subs['Night'].astype(str) == str(night['Night'])].astype({'Username': str}).drop_duplicates('Username', keep='last') if not subs.empty else subs
+        mine = mine[mine['Username'].isin(row)] if not mine.empty else mine
+        if not mine.empty:
+            code = {p: i for i, p in enumerate(players)}
+            picks[mine['Username'].map(row).to_numpy(dtype=int)] = np.column_stack([mine[r].astype(str).str.strip().map(code).fillna(-1).to_numpy(dtype=int) for r in rules.rounds])
+        hits = picks[None, :, :] == BRACKETS[:, None, :]               # brackets x users x rounds
+        pts = hits.astype(np.int32) @ weights
+        if rules.perfect: pts += rules.perfect * hits.all(axis=2)
+        events.append((bracket_probs(players, ratings), _points_table(pts)))
+    return events
+
+def _ranks(totals, rng):
+    """Finishing position per row, best total first. Level totals are split at random, so every
+    simulated season has exactly one champion and Win % adds up to 100."""
+    c, n = totals.shape
+    order = np.argsort(-(totals + rng.random((c, n)) * 0.5), axis=1)
+    ranks = np.empty((c, n), dtype=np.int32)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(1, n + 1, dtype=np.int32), (c, n)), axis=1)
+    return ranks
+
+def position_bands(n):
+    """First position of each finishing band: 1..EXACT_POSITIONS one by one, then ~10 widening bands."""
+    if n <= EXACT_POSITIONS + 5: return np.arange(1, n + 1)
+    return np.unique(np.r_[np.arange(1, EXACT_POSITIONS + 1), np.geomspace(EXACT_POSITIONS + 1, n, 10).astype(int)])
+
+class Projection:
+    """Finishing-position counts per user over `seasons` simulated seasons."""
+    def __init__(self, usernames, current, counts, rank_sum, bands, seasons, events):
+        self.usernames, self.current, self.counts, self.bands = usernames, current, counts, bands
+        self.seasons, self.events = seasons, events
+        self.mean = rank_sum / max(seasons, 1)
+        self._pos = {u: i for i, u in enumerate(usernames)}
+
+    def __len__(self):
+        return len(self.usernames)
+
+    def __contains__(self, username):
+        return username in self._pos
+
+    def labels(self):
+        stops = np.r_[self.bands[1:] - 1, len(self.usernames)]
+        return [str(a) if a == b else f"{a}-{b}" for a, b in zip(self.bands, stops)]
+
+    def table(self):
+        """Username, Win %, Top 3 %, Avg Finish; most likely champion first."""
+        share = self.counts / max(self.seasons, 1) * 100
+        top3 = share[:, :np.searchsorted(self.bands, 4)].sum(axis=1)
+        df = pd.DataFrame({'Username': self.usernames, 'Win %': share[:, 0].round(1), 'Top 3 %': top3.round(1), 'Avg Finish': self.mean.round(1)})
+        return df.sort_values(['Win %', 'Avg Finish', 'Username'], ascending=[False, True, True], kind='stable').reset_index(drop=True)
+
+    def distribution(self, username):
+        """% of seasons the user finished in each position band."""
+        i = self._pos.get(username)
+        values = self.counts[i] / max(self.seasons, 1) * 100 if i is not None else np.zeros(len(self.bands))
+        return pd.Series(values, index=pd.Index(self.labels(), name='Finish'), name='%')
+
+def simulate(usernames, current, events, seasons=SEASONS, seed=SEED, max_work=MAX_WORK):
+    """Play the remaining events `seasons` times (fewer if that would exceed max_work) and count finishes."""
+    n = len(usernames)
+    bands = position_bands(n)
+    if not n: return Projection([], current, np.zeros((0, len(bands)), dtype=np.int64), np.zeros(0), bands, 0, 0)
+    # Nothing left to play: the table is final and one pass ranks it.
+    seasons = max(1, min(seasons, max_work // (n * (len(events) + RANK_COST)))) if events else 1
+    rng = np.random.default_rng(seed)
+    cdfs = [np.cumsum(probs) for probs, _ in events]
+    counts, rank_sum = np.zeros(n * len(bands), dtype=np.int64), np.zeros(n)
+    offsets = np.arange(n) * len(bands)
+    batch = max(1, BATCH_CELLS // n)
+    for start in range(0, seasons, batch):
+        c = min(batch, seasons - start)
+        totals = np.repeat(current[None, :].astype(np.int32), c, axis=0)
+        for cdf, (_, table) in zip(cdfs, events):
+            totals += table[np.minimum(np.searchsorted(cdf, rng.random(c), side='right'), len(cdf) - 1)]
+        ranks = _ranks(totals, rng)
+        rank_sum += ranks.sum(axis=0)
+        counts += np.bincount((np.searchsorted(bands, ranks, side='right') - 1 + offsets).ravel(), minlength=len(counts))
+    return Projection(usernames, current, counts.reshape(n, len(bands)), rank_sum, bands, seasons, len(events))
+
+def project_matches(standings, matches, predictions, results, stats, rules=None, **kw):
+    """Title odds for app.py: Standings plus every unresulted match, scored with `rules`."""
+    usernames, current = _users(standings, 'Current Points', predictions)
+    return simulate(usernames, current, match_events(matches, predictions, results, Ratings(stats), usernames, rules), **kw)
+
+def project_nights(standings, admin, subs, results, stats, rules=None, **kw):
+    """Title odds for pl_darts_2026.py: PL standings plus every night without results, scored with `rules`."""
+    usernames, current = _users(standings, 'Total', subs)
+    return simulate(usernames, current, night_events(admin, subs, results, Ratings(stats), usernames, rules), **kw)
@@ -0,0 +1,168 @@
+"""Daily "lock in your predictions" mail-out.
+
+Runs standalone (the daily GitHub workflow does this) or inside the app (?trigger_reminders=true):
+
+    python reminders.py --dry-run
+    python reminders.py --workers 4 --rate 2 --smtp-host localhost --smtp-port 1025 --no-tls
+
+Standalone runs read .streamlit/secrets.toml for [storage] and [gmail] like the app does.
+Each league (leagues.py) is checked against its own Predictions partition, and every delivered
+mail is recorded in that league's Reminders partition keyed by (Date, Username), so a rerun on
+the same day only mails the users that were missed or failed last time."""
+import argparse
+import smtplib
+import threading
+import time
+import tomllib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+import pandas as pd
+import leagues
+import schema
+import storage
+
+SUBJECT = "🎯 Darts Reminder: Matches Start Today!"
+BODY = "Hi {username},\n\nMatches are starting today! Don't forget to head over to the app and lock in your predictions.\n\nGood luck!"
+
+@dataclass
+class SMTPSettings:
+    user: str = ""
+    password: str = ""
+    host: str = "smtp.gmail.com"
+    port: int = 587
+    tls: bool = True
+
+    @classmethod
+    def from_secrets(cls, gmail, **overrides):
+        return cls(user=gmail.get("user", ""), password=gmail.get("password", ""), **overrides)
+
+def missing_users(users, predictions, matches, day):
+    """Users with an email address who have not predicted every match on `day` (one anti-join).
+
+    Takes typed frames (schema.coerce), so Match_IDs compare as integers."""
+    todays = matches.loc[matches['Date'].dt.date == day, ['Match_ID']].drop_duplicates()
+    mailable = users[users['Email'].astype(str).str.contains("@", na=False)][['Username', 'Email']].drop_duplicates('Username')
+    if todays.empty or mailable.empty: return mailable.iloc[:0]
+    wanted = mailable[['Username']].merge(todays, how='cross')
+    made = predictions[['Username', 'Match_ID']].astype({'Username': str}) if not predictions.empty else pd.DataFrame(columns=['Username', 'Match_ID'])
+    gaps = wanted.merge(made.drop_duplicates(), on=['Username', 'Match_ID'], how='left', indicator=True)
+    return mailable[mailable['Username'].isin(gaps.loc[gaps['_merge'] == 'left_only', 'Username'])]
+
+class RateLimiter:
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0: time.sleep(delay)
+
+class SMTPPool:
+    """One SMTP session per worker thread, opened on first use and reopened after a failure."""
+    def __init__(self, settings):
+        self.settings = settings
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def send(self, msg):
+        server = getattr(self._local, 'server', None)
+        if server is None:
+            s = self.settings
+            server = smtplib.SMTP(s.host, s.port, timeout=30)
+            if s.tls: server.starttls()
+            if s.user and s.password: server.login(s.user, s.password)
+            self._local.server = server
+            with self._lock: self._all.append(server)
+        try: server.send_message(msg)
+        except Exception:
+            self._local.server = None
+            raise
+
+    def close(self):
+        for server in self._all:
+            try: server.quit()
+            except Exception: pass
+
+def build_message(sender, user):
+    msg = MIMEMultipart()
+    msg['From'] = f"PDC Predictor <{sender}>"
+    msg['To'] = user['Email']
+    msg['Subject'] = SUBJECT
+    msg.attach(MIMEText(BODY.format(username=user['Username']), 'plain'))
+    return msg
+
+def _read(backend, worksheet):
+    try: return schema.coerce(worksheet, backend.read(worksheet))[0]
+    except Exception: return pd.DataFrame()
+
+def league_targets(backend, members, matches, league, day):
+    """(users to mail, how many were already mailed today) for one league's members."""
+    targets = missing_users(members, _read(backend, storage.partition("Predictions", league)), matches, day)
+    log = _read(backend, storage.partition("Reminders", league))
+    sent_before = set(log.loc[log['Date'].astype(str) == str(day), 'Username'].astype(str)) if not log.empty else set()
+    return targets[~targets['Username'].astype(str).isin(sent_before)].assign(League=league), len(sent_before)
+
+def run(backend, smtp, day=None, dry_run=False, workers=4, rate=5.0, writer=None):
+    day = day or datetime.now().date()
+    users, matches = schema.coerce("Users", backend.read("Users"))[0], schema.coerce("Matches", backend.read("Matches"))[0]
+    membership = leagues.Membership(users)
+    per_league = [league_targets(backend, membership.select(users, lg), matches, lg, day) for lg in membership.leagues]
+    targets = pd.concat([t for t, _ in per_league], ignore_index=True)
+    sent_before = sum(n for _, n in per_league)
+    if targets.empty: return f"No reminders needed for {day} ({sent_before} already sent)."
+    if dry_run: return f"Dry run: would remind {len(targets)} users: " + ", ".join(targets['Username'].astype(str))
+    writer = writer or storage.WriteQueue(backend)
+    pool, limiter = SMTPPool(smtp), RateLimiter(rate)
+    def deliver(user):
+        # (username, send error, record error); a failed record must not hide that the mail went out.
+        limiter.wait()
+        try:
+            pool.send(build_message(smtp.user, user))
+        except Exception as e:
+            return user['Username'], e, None
+        try: writer.submit(storage.partition("Reminders", user['League']), {"Date": str(day), "Username": user['Username'], "Sent_At": str(datetime.now())})
+        except Exception as e: return user['Username'], None, e
+        return user['Username'], None, None
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            outcomes = list(ex.map(deliver, targets.to_dict('records')))
+    finally:
+        pool.close()
+    failed = [f"{u} ({e})" for u, e, _ in outcomes if e is not None]
+    unrecorded = [f"{u} ({e})" for u, _, e in outcomes if e is not None]
+    msg = f"Success: {len(outcomes) - len(failed)} reminders sent."
+    if unrecorded: msg += f" Sent but not recorded (a rerun today would mail them again): {', '.join(unrecorded)}"
+    return msg + (f" Failed: {', '.join(failed)}" if failed else "")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Email users who have not predicted today's matches.")
+    ap.add_argument("--secrets", default=".streamlit/secrets.toml")
+    ap.add_argument("--date", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(), help="match day, default today")
+    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--workers", type=int, default=4, help="concurrent SMTP sessions")
+    ap.add_argument("--rate", type=float, default=5.0, help="max mails per second across all sessions")
+    ap.add_argument("--smtp-host", default="smtp.gmail.com")
+    ap.add_argument("--smtp-port", type=int, default=587)
+    ap.add_argument("--no-tls", action="store_true")
+    args = ap.parse_args(argv)
+    try:
+        with open(args.secrets, "rb") as f: secrets = tomllib.load(f)
+    except FileNotFoundError: secrets = {}
+    def gsheets():
+        import streamlit as st
+        from streamlit_gsheets import GSheetsConnection
+        return st.connection("gsheets", type=GSheetsConnection), secrets["connections"]["gsheets"]["spreadsheet"]
+    backend = storage.backend_from_config(secrets.get("storage", {}), gsheets)
+    smtp = SMTPSettings.from_secrets(secrets.get("gmail", {}), host=args.smtp_host, port=args.smtp_port, tls=not args.no_tls)
+    print(run(backend, smtp, day=args.date, dry_run=args.dry_run, workers=args.workers, rate=args.rate))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Process-wide plumbing shared by app.py and pl_darts_2026.py.
+
+The get_* functions are st.cache_resource, so each process builds them once and every session
+shares them: the event recorder, the storage backend, the thumbnail cache, and per app (keyed by
+its name) the sheet cache and the write queue. An App is made at the top of every rerun and
+carries what differs between the two apps: the name its local snapshots live under and its sheet
+policies. Its methods are the data access the pages use (prefetch, get_data, get_derived,
+put_data, put_rows)."""
+import os
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+import images
+import schema
+import sheetcache
+import snapshots
+import storage
+import telemetry
+
+def settings(section):
+    try: return dict(st.secrets.get(section, {}))
+    except Exception: return {}
+
+@st.cache_resource
+def get_recorder():
+    # Events are kept in memory only, unless [telemetry] log = "telemetry.jsonl" in secrets.toml (or DARTS_TELEMETRY)
+    # names a JSON-lines log, rotated at max_mb (default 10)
+    config = settings("telemetry")
+    path = os.environ.get("DARTS_TELEMETRY", config.get("log", ""))
+    return telemetry.Recorder(path or None, max_bytes=int(float(config.get("max_mb", 10)) * 1024 * 1024))
+
+@st.cache_resource
+def get_backend():
+    # [storage] backend = "gsheets" (default) or "sqlite" in secrets.toml
+    backend = storage.backend_from_config(settings("storage"), lambda: (st.connection("gsheets", type=GSheetsConnection), st.secrets["connections"]["gsheets"]["spreadsheet"]))
+    return telemetry.InstrumentedBackend(backend, get_recorder())
+
+@st.cache_resource
+def get_images():
+    # Player photos are fetched once and kept as small thumbnails in static/thumbs, which Streamlit serves at
+    # app/static/thumbs (server.enableStaticServing), so each browser downloads a photo once and caches it.
+    # [images] max_mb = 50 in secrets.toml caps the directory; DARTS_IMAGES moves it (tests: it is then not served)
+    config = settings("images")
+    directory = os.environ.get("DARTS_IMAGES") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "thumbs")
+    return images.ThumbnailCache(directory, "app/static/thumbs", int(float(config.get("max_mb", 50)) * 1024 * 1024))
+
+@st.cache_resource
+def get_rejects(app):
+    return {}
+
+def load_sheet(app, worksheet):
+    df = get_backend().read(worksheet).reset_index(drop=True)
+    df.columns = df.columns.astype(str).str.strip()
+    # Typed once here (see schema.py); everything downstream gets integer Match_IDs, real dates and clean names.
+    df, rejects = schema.coerce(worksheet, df)
+    get_rejects(app)[worksheet] = rejects
+    return df
+
+@st.cache_resource
+def get_cache(app, policies, default):
+    # [snapshot] dir = ".snapshot" (default) in secrets.toml, or DARTS_SNAPSHOT; "" turns local snapshots off
+    root = os.environ.get("DARTS_SNAPSHOT", settings("snapshot").get("dir", ".snapshot"))
+    store = snapshots.SnapshotStore(os.path.join(root, app)) if root else None
+    cache = sheetcache.SheetCache(lambda ws: load_sheet(app, ws), policies, default=default, on_access=lambda ws, result: get_recorder().count("cache", ws, result),
+                                  on_change=store.save if store else None)
+    # Cold start: serve the last local copy of every sheet while they are re-read in the background.
+    if store: store.seed(cache)
+    return cache
+
+@st.cache_resource
+def get_writer(app, policies, default):
+    # Duplicate keys are caught against the cached sheet, so a submit does not read the sheet.
+    cache = get_cache(app, policies, default)
+    return storage.WriteQueue(get_backend(), on_write=cache.invalidate, known=cache.peek)
+
+class App:
+    """One app's handle on the shared resources; policies map worksheet -> (ttl, stale-while-revalidate) seconds."""
+    def __init__(self, name, policies, default):
+        self.name = name
+        self.policies = policies
+        self.default = default
+        # Frames fetched ahead for the current page (see prefetch); each is handed out once by get_data,
+        # and only while its worksheet is still at the version it was fetched at.
+        self.page_data = {}
+
+    def cache(self):
+        return get_cache(self.name, self.policies, self.default)
+
+    def writer(self):
+        return get_writer(self.name, self.policies, self.default)
+
+    def rejects(self):
+        return get_rejects(self.name)
+
+    def prefetch(self, name, worksheets):
+        with get_recorder().span("prefetch", name, worksheets=len(worksheets)):
+            try: self.page_data.update(self.cache().get_many(worksheets))
+            except: pass
+
+    def get_data(self, worksheet):
+        df, version = self.page_data.pop(worksheet, (None, None))
+        if df is not None and version == self.cache().version(worksheet): return df
+        try: return self.cache().get(worksheet)
+        except: return pd.DataFrame()
+
+    def get_derived(self, name, worksheets, build):
+        try: return self.cache().derived(name, worksheets, build)
+        except: return build(*[pd.DataFrame() for _ in worksheets])
+
+    def put_data(self, worksheet, df):
+        get_backend().write(worksheet, schema.strip(df))
+        self.cache().invalidate(worksheet)
+
+    def put_rows(self, worksheet, rows, key):
+        # Replaces only the rows sharing `key`, so rows the schema rejected stay in the sheet for fixing.
+        # Goes through the write queue's per-sheet lock, so it never interleaves with queued appends.
+        self.writer().upsert(worksheet, schema.strip(rows), key)
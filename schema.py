@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+from scoring import parse_scores
+from storage import base_sheet
+
+# Column types per worksheet, applied once when a sheet is loaded:
+#   id       whole number (Match_ID); rows without a valid id are rejected
+#   datetime parsed timestamp, NaT (and a reject entry) when unparseable
+#   category pandas categorical, for names repeated on every row
+#   str      stripped text, missing stays missing
+#   int      integer, missing counts as 0
+#   score    "u1-u2" text, additionally split into nullable Score_P1 / Score_P2
+SCHEMAS = {
+    "Users": {"Username": "str", "Password": "str", "Email": "str", "League": "str"},
+    "Matches": {"Match_ID": "id", "Date": "datetime", "Player1": "category", "Player2": "category"},
+    "Predictions": {"Username": "category", "Match_ID": "id", "Score": "score"},
+    "Results": {"Match_ID": "id", "Score": "score"},
+    "Standings": {"Username": "str", "Current Points": "int"},
+    "Reminders": {"Date": "str", "Username": "str"},
+    "PL_2026_Admin": {"Night": "str", "Cutoff": "datetime"},
+    "User_Submissions": {"Username": "category", "Night": "str", "QF1": "str", "QF2": "str", "QF3": "str", "QF4": "str", "SF1": "str", "SF2": "str", "Final": "str"},
+    "PL_Results": {"Night": "str", "QF1": "str", "QF2": "str", "QF3": "str", "QF4": "str", "SF1": "str", "SF2": "str", "Final": "str"},
+    "PL_Standings": {"Username": "str", "Total": "int"},
+    "Standings_History": {"Day": "str", "Username": "str", "Points": "int", "Rank": "int", "Movement": "int"},
+    "PL_History": {"Day": "str", "Username": "str", "Points": "int", "Rank": "int", "Movement": "int"},
+}
+DERIVED = ["Score_P1", "Score_P2"]
+
+def _text(col):
+    out = col.astype(object)
+    present = out.notna()
+    out[present] = out[present].astype(str).str.strip()
+    return out
+
+def coerce(worksheet, df):
+    """Return (typed frame, rejects) for a raw worksheet; rejects lists Row/Column/Value/Problem.
+
+    League partitions ("Predictions@office") use their base sheet's schema."""
+    spec = SCHEMAS.get(base_sheet(worksheet), {})
+    df = df.copy()
+    rejects, drop = [], np.zeros(len(df), dtype=bool)
+    def reject(mask, column, problem):
+        for i in np.flatnonzero(mask):
+            # +2: sheet rows are 1-based and row 1 is the header
+            rejects.append({"Row": df.index[i] + 2, "Column": column, "Value": df[column].iloc[i], "Problem": problem})
+    for column, kind in spec.items():
+        if column not in df.columns: continue
+        col = df[column]
+        if kind == "id":
+            num = pd.to_numeric(col, errors='coerce')
+            fractional = (num.notna() & (num % 1 != 0)).to_numpy()
+            reject(num.isna().to_numpy(), column, "missing or not a number")
+            reject(fractional, column, "not a whole number")
+            drop |= num.isna().to_numpy() | fractional
+            df[column] = num.fillna(0).astype('int64')
+        elif kind == "datetime":
+            parsed = pd.to_datetime(col, errors='coerce', format='mixed')
+            reject((parsed.isna() & col.notna()).to_numpy(), column, "unparseable date")
+            df[column] = parsed
+        elif kind == "category":
+            df[column] = _text(col).astype('category')
+        elif kind == "str":
+            df[column] = _text(col)
+        elif kind == "int":
+            df[column] = pd.to_numeric(col, errors='coerce').fillna(0).astype('int64')
+        elif kind == "score":
+            a, b, ok = parse_scores(col)
+            reject(~ok & col.notna().to_numpy(), column, "score is not u1-u2")
+            df["Score_P1"] = pd.arrays.IntegerArray(a.astype('int16'), ~ok)
+            df["Score_P2"] = pd.arrays.IntegerArray(b.astype('int16'), ~ok)
+    rejects = pd.DataFrame(rejects, columns=["Row", "Column", "Value", "Problem"])
+    return df[~drop], rejects
+
+def strip(df):
+    """Drop the columns coerce() added, before a typed frame is written back to its sheet."""
+    return df.drop(columns=[c for c in DERIVED if c in df.columns])
@@ -0,0 +1,138 @@
+from dataclasses import dataclass, field, fields
+import numpy as np
+import pandas as pd
+
+# --- RULES ---
+# Point values for both games, e.g. from the [scoring] / [pl_scoring] tables in secrets.toml.
+# Each compiles to whole-column array operations over a scored frame, so the full history can
+# be rescored under another rule set without re-joining predictions to results.
+
+@dataclass
+class MatchRules:
+    exact: int = 3       # exact scoreline (replaces winner and margin)
+    winner: int = 1      # right winner
+    margin: int = 0      # right winner and leg difference, on top of winner
+    whitewash: int = 0   # bonus on top of the rest: a whitewash predicted for the right winner
+
+    @classmethod
+    def from_config(cls, config):
+        unknown = set(config) - {f.name for f in fields(cls)}
+        if unknown: raise ValueError(f"Unknown scoring rules: {', '.join(sorted(unknown))}")
+        return cls(**{k: int(v) for k, v in config.items()})
+
+    def points(self, scored):
+        """Pts per row of a score_predictions() frame under these rules."""
+        nums = scored[['U1', 'U2', 'R1', 'R2']]
+        valid = nums.notna().all(axis=1).to_numpy()
+        u1, u2, r1, r2 = (nums[c].fillna(0).to_numpy(dtype=np.int32) for c in nums.columns)
+        return self.match_points(u1, u2, r1, r2, valid)
+
+    def match_points(self, u1, u2, r1, r2, valid):
+        exact = (u1 == r1) & (u2 == r2)
+        outcome = (np.sign(u1 - u2) == np.sign(r1 - r2)) & (u1 != u2)
+        pts = np.where(exact, self.exact, np.where(outcome, self.winner + self.margin * ((u1 - u2) == (r1 - r2)), 0))
+        if self.whitewash: pts = pts + self.whitewash * (outcome & (np.minimum(u1, u2) == 0) & (np.minimum(r1, r2) == 0))
+        return np.where(valid, pts, 0)
+
+@dataclass
+class BracketRules:
+    rounds: dict = field(default_factory=lambda: {"QF1": 2, "QF2": 2, "QF3": 2, "QF4": 2, "SF1": 3, "SF2": 3, "Final": 5})
+    perfect: int = 0     # bonus for calling every round of a night
+
+    @classmethod
+    def from_config(cls, config):
+        """{"QF": 2, "SF": 3, "Final": 5, "perfect": 0}; a key sets every round it prefixes ("QF" -> QF1..QF4)."""
+        rules = cls()
+        for key, value in config.items():
+            if key == "perfect": rules.perfect = int(value); continue
+            hit = [r for r in rules.rounds if r.startswith(key)]
+            if not hit: raise ValueError(f"Unknown scoring round: {key}")
+            for r in hit: rules.rounds[r] = int(value)
+        return rules
+
+    def points(self, scored):
+        """Pts per row of a score_pl_submissions() frame under these rules."""
+        hits = np.column_stack([(scored[f"{r}_u"] == scored[f"{r}_r"]).to_numpy(dtype=bool) for r in self.rounds]) if len(scored) else np.zeros((0, len(self.rounds)), dtype=bool)
+        pts = hits.astype(np.int64) @ np.fromiter(self.rounds.values(), dtype=np.int64)
+        return pts + self.perfect * hits.all(axis=1) if self.perfect else pts
+
+MATCH_RULES = MatchRules()
+BRACKET_RULES = BracketRules()
+
+# --- MATCH SCORING (app.py) ---
+def parse_scores(col):
+    """Split "u1-u2" strings into (home, away, valid) arrays.
+
+    Only the distinct strings are parsed (a season has a few hundred at most),
+    every row is then a lookup into that table. Malformed or missing scores
+    come back as 0-0 with valid=False."""
+    codes, uniques = pd.factorize(pd.Series(col), use_na_sentinel=True)
+    # One spare row at the end so code -1 (missing) lands on an invalid 0-0.
+    lut = np.zeros((len(uniques) + 1, 2), dtype=np.int32)
+    ok = np.zeros(len(uniques) + 1, dtype=bool)
+    for i, s in enumerate(uniques):
+        try:
+            lut[i] = [int(x) for x in str(s).split('-')]
+            ok[i] = True
+        except (ValueError, OverflowError):
+            pass
+    return lut[codes, 0], lut[codes, 1], ok[codes]
+
+def _split(df):
+    # Sheets loaded through schema.coerce already carry Score_P1/Score_P2.
+    if 'Score_P1' in df.columns: return df['Score_P1'], df['Score_P2']
+    a, b, ok = parse_scores(df['Score'])
+    return pd.arrays.IntegerArray(a.astype('int16'), ~ok), pd.arrays.IntegerArray(b.astype('int16'), ~ok)
+
+def score_predictions(p_df, r_df, rules=None):
+    """Predictions joined to Results on Match_ID with a per-row Pts column.
+
+    Both frames are expected to be typed (integer Match_ID), see schema.coerce."""
+    u1, u2 = _split(p_df); r1, r2 = _split(r_df)
+    p = pd.DataFrame({'Username': p_df['Username'].to_numpy(), 'Match_ID': p_df['Match_ID'].to_numpy(), 'U1': u1, 'U2': u2})
+    r = pd.DataFrame({'Match_ID': r_df['Match_ID'].to_numpy(), 'R1': r1, 'R2': r2})
+    merged = p.merge(r, on='Match_ID')
+    merged['Pts'] = (rules or MATCH_RULES).points(merged)
+    return merged
+
+def user_totals(scored):
+    totals = scored.groupby('Username', observed=True)['Pts'].sum()
+    totals.index = totals.index.astype(str)
+    return totals
+
+def leaderboard(p_df, r_df, rules=None):
+    if p_df.empty or r_df.empty: return pd.DataFrame(columns=['Username', 'Current Points'])
+    totals = user_totals(score_predictions(p_df, r_df, rules))
+    return totals.rename_axis('Username').reset_index(name='Current Points').sort_values('Current Points', ascending=False)
+
+# --- BRACKET SCORING (pl_darts_2026.py) ---
+PL_ROUNDS = dict(BRACKET_RULES.rounds)
+
+def score_pl_submissions(subs, results, rules=None):
+    """User_Submissions joined to PL_Results on Night with a per-row Pts column (typed frames, see schema.coerce)."""
+    cols = ['Night'] + list(PL_ROUNDS)
+    merged = subs[['Username'] + cols].merge(results[cols], on='Night', suffixes=('_u', '_r'))
+    merged['Pts'] = (rules or BRACKET_RULES).points(merged)
+    return merged
+
+def pl_leaderboard(users, subs, results, rules=None):
+    if users.empty: return pd.DataFrame(columns=["Username", "Total"])
+    lb = pd.DataFrame({"Username": pd.unique(users['Username'].astype(str))})
+    if not subs.empty and not results.empty:
+        totals = user_totals(score_pl_submissions(subs, results, rules))
+        lb['Total'] = lb['Username'].map(totals).fillna(0).astype(int)
+    else: lb['Total'] = 0
+    return lb.sort_values(by="Total", ascending=False)
+
+# --- WHAT-IF ---
+def what_if(scored, rules):
+    """Each user's points and rank as scored vs under `rules`, from an already scored frame.
+
+    Only the Pts column is recomputed, so this is a handful of array passes plus one groupby."""
+    now, alt = user_totals(scored), user_totals(scored.assign(Pts=rules.points(scored)))
+    df = pd.DataFrame({'Now': now, 'What-if': alt}).fillna(0).astype('int64').rename_axis('Username')
+    df['Change'] = df['What-if'] - df['Now']
+    df['Rank Now'] = df['Now'].rank(method='min', ascending=False).astype('int64')
+    df['Rank What-if'] = df['What-if'].rank(method='min', ascending=False).astype('int64')
+    df['Moved'] = df['Rank Now'] - df['Rank What-if']
+    return df.reset_index().sort_values(['What-if', 'Username'], ascending=[False, True], kind='stable').reset_index(drop=True)
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+class SheetCache:
+    """Process-wide worksheet cache with a version counter per worksheet.
+
+    Each worksheet has its own (ttl, stale) policy. A fresh entry is a hit. An entry past its ttl
+    but inside its stale window is served as-is while one background thread refetches it. Anything
+    older is reloaded before returning. A worksheet's version goes up whenever its contents change
+    (a reload that returns different data, or an explicit invalidate after a write), so derived
+    data can be keyed on versions() instead of being recomputed every rerun.
+
+    A worksheet can also be seeded with data from elsewhere (a local snapshot): it is served as a
+    stale hit, whatever its policy, until the first real load replaces it. on_change(worksheet, df)
+    is called whenever a load brings different contents."""
+    def __init__(self, loader, policies=None, default=(5, 0), on_access=None, on_change=None):
+        self.loader = loader
+        self.on_access = on_access
+        self.on_change = on_change
+        self.policies = policies or {}
+        self.default = default
+        self.hits = Counter()
+        self.stale_hits = Counter()
+        self.misses = Counter()
+        self._entries = {}
+        self._versions = Counter()
+        self._fingerprints = {}
+        self._derived = {}
+        self._refreshing = set()
+        self._seeded = {}
+        self._lock = threading.Lock()
+        self._load_locks = defaultdict(threading.Lock)
+
+    def get(self, worksheet):
+        return self._get(worksheet)[0].copy()
+
+    def get_many(self, worksheets, workers=8):
+        """{worksheet: (copy, version)} for several worksheets in one go.
+
+        Everything already cached is taken first, then the misses are loaded concurrently on at
+        most `workers` threads, so a cold page waits for its slowest sheet rather than the sum of
+        them. A worksheet whose load fails is left out; get() it to see the error."""
+        frames = self._get_many(worksheets, workers)
+        return {w: (df.copy(), version) for w, (df, version) in frames.items()}
+
+    def derived(self, name, worksheets, build):
+        """build(*frames) memoized on the worksheets' versions, so it only reruns after they change.
+
+        build gets the cached frames themselves (not copies) and must not modify them. The key is
+        the version each frame was read at, so a refresh landing mid-call cannot pair an old frame
+        with a new version."""
+        loaded = self._get_many(worksheets)
+        frames, key = zip(*[loaded[w] if w in loaded else self._get(w) for w in worksheets]) if worksheets else ((), ())
+        with self._lock: hit = self._derived.get(name)
+        if hit and hit[0] == key: return hit[1]
+        value = build(*frames)
+        with self._lock: self._derived[name] = (key, value)
+        return value
+
+    # _get, _get_many, _lookup and _load hand out (frame, version) pairs read under one lock.
+    def _get(self, worksheet):
+        result = self._lookup(worksheet)
+        if self.on_access: self.on_access(worksheet, result[0])
+        return result[1] if result[0] != "miss" else self._load(worksheet)
+
+    def _get_many(self, worksheets, workers=8):
+        frames, todo = {}, []
+        for w in dict.fromkeys(worksheets):
+            result = self._lookup(w)
+            if self.on_access: self.on_access(w, result[0])
+            if result[0] == "miss": todo.append(w)
+            else: frames[w] = result[1]
+        if len(todo) == 1:
+            try: frames[todo[0]] = self._load(todo[0])
+            except Exception: pass
+        elif todo:
+            with ThreadPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+                futures = {w: pool.submit(self._load, w) for w in todo}
+            for w, f in futures.items():
+                if f.exception() is None: frames[w] = f.result()
+        return frames
+
+    def _lookup(self, worksheet):
+        ttl, stale = self.policies.get(worksheet, self.default)
+        with self._lock:
+            entry = self._entries.get(worksheet)
+            age = time.monotonic() - entry[1] if entry else None
+            if entry and age < ttl:
+                self.hits[worksheet] += 1
+                return "hit", (entry[0], self._versions[worksheet])
+            if entry and (age < ttl + stale or worksheet in self._seeded):
+                self.stale_hits[worksheet] += 1
+                if worksheet not in self._refreshing:
+                    self._refreshing.add(worksheet)
+                    threading.Thread(target=self._refresh, args=(worksheet,), daemon=True).start()
+                return "stale", (entry[0], self._versions[worksheet])
+            self.misses[worksheet] += 1
+        return "miss", None
+
+    def peek(self, worksheet):
+        """The cached frame (not a copy) whatever its age, or None; never loads and is not counted."""
+        with self._lock:
+            entry = self._entries.get(worksheet)
+            return entry[0] if entry else None
+
+    def seed(self, worksheet, df, as_of=None):
+        """Serve df for worksheet until it is loaded for real; ignored if it is already cached."""
+        fp = _fingerprint(df)
+        with self._lock:
+            if worksheet in self._entries: return False
+            self._entries[worksheet] = (df, float('-inf'))
+            self._fingerprints[worksheet] = fp
+            self._versions[worksheet] += 1
+            self._seeded[worksheet] = as_of
+        return True
+
+    def sync(self, worksheets):
+        """Reload worksheets one after another on a background thread (stale entries keep serving)."""
+        with self._lock:
+            todo = [w for w in worksheets if w not in self._refreshing]
+            self._refreshing.update(todo)
+        if todo: threading.Thread(target=lambda: [self._refresh(w) for w in todo], daemon=True).start()
+
+    def as_of(self):
+        """Oldest snapshot time among seeded worksheets not yet reloaded, or None once all are synced."""
+        with self._lock: times = [t for t in self._seeded.values() if t is not None]
+        return min(times) if times else None
+
+    def syncing(self, *worksheets):
+        """True while any of worksheets (default: any at all) is still served from its seed."""
+        with self._lock: return any(w in self._seeded for w in worksheets) if worksheets else bool(self._seeded)
+
+    def version(self, worksheet):
+        return self._versions[worksheet]
+
+    def versions(self, *worksheets):
+        return tuple(self._versions[w] for w in worksheets)
+
+    def invalidate(self, *worksheets):
+        with self._lock:
+            for w in worksheets:
+                self._entries.pop(w, None)
+                self._seeded.pop(w, None)
+                self._fingerprints.pop(w, None)
+                self._versions[w] += 1
+
+    def stats(self):
+        names = sorted(set(self.hits) | set(self.stale_hits) | set(self.misses) | set(self._versions))
+        return pd.DataFrame({"Worksheet": names, "Hits": [self.hits[n] for n in names], "Stale Hits": [self.stale_hits[n] for n in names],
+                             "Misses": [self.misses[n] for n in names], "Version": [self._versions[n] for n in names]})
+
+    def _load(self, worksheet):
+        # One loader per worksheet at a time; concurrent misses wait and reuse its result.
+        with self._load_locks[worksheet]:
+            with self._lock:
+                entry = self._entries.get(worksheet)
+                if entry and time.monotonic() - entry[1] < self.policies.get(worksheet, self.default)[0]: return entry[0], self._versions[worksheet]
+            df = self.loader(worksheet)
+            return df, self._store(worksheet, df)
+
+    def _refresh(self, worksheet):
+        try:
+            with self._load_locks[worksheet]: self._store(worksheet, self.loader(worksheet))
+        except Exception: pass
+        finally:
+            with self._lock: self._refreshing.discard(worksheet)
+
+    def _store(self, worksheet, df):
+        fp = _fingerprint(df)
+        with self._lock:
+            changed = fp is None or fp != self._fingerprints.get(worksheet)
+            if changed: self._versions[worksheet] += 1
+            self._fingerprints[worksheet] = fp
+            self._entries[worksheet] = (df, time.monotonic())
+            self._seeded.pop(worksheet, None)
+            version = self._versions[worksheet]
+        if changed and self.on_change:
+            try: self.on_change(worksheet, df)
+            except Exception: pass
+        return version
+
+def _fingerprint(df):
+    try: return int(pd.util.hash_pandas_object(df, index=False).sum()), tuple(df.columns)
+    except Exception: return None
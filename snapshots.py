@@ -0,0 +1,63 @@
+"""Local columnar copy of every worksheet, for fast cold starts.
+
+Each typed worksheet is kept as an Arrow IPC file (one per sheet) and rewritten whenever the
+sheet's contents change. On startup the files are memory-mapped and seeded into the SheetCache,
+so the first page renders from disk while the sheets are re-read in the background; only sheets
+whose rows actually differ get a new version (and a new snapshot). Worksheets holding credentials
+(PRIVATE: emails and password hashes in Users) are never written to disk and always read live."""
+import os
+import threading
+from datetime import datetime
+from urllib.parse import quote, unquote
+import pyarrow as pa
+
+PRIVATE = ("Users",)
+
+class SnapshotStore:
+    def __init__(self, directory, exclude=PRIVATE):
+        self.directory = directory
+        self.exclude = set(exclude)
+        os.makedirs(directory, exist_ok=True)
+        # Drop copies written before a sheet was excluded.
+        for worksheet in self.exclude:
+            try: os.remove(self.path(worksheet))
+            except OSError: pass
+
+    def path(self, worksheet):
+        return os.path.join(self.directory, quote(worksheet, safe='') + ".arrow")
+
+    def save(self, worksheet, df):
+        """Write df atomically; excluded sheets and frames Arrow cannot hold (mixed-type columns) are skipped."""
+        if worksheet in self.exclude: return False
+        try: table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowException, TypeError, ValueError): return False
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"saved_at": datetime.now().isoformat().encode()})
+        path = self.path(worksheet)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp, "wb") as f, pa.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        return True
+
+    def load(self, worksheet):
+        """(frame, saved_at) from the memory-mapped file, or None if there is no usable snapshot."""
+        try:
+            with pa.memory_map(self.path(worksheet)) as source:
+                table = pa.ipc.open_file(source).read_all()
+                df = table.to_pandas()
+        except (OSError, pa.ArrowException): return None
+        saved_at = (table.schema.metadata or {}).get(b"saved_at", b"").decode()
+        return df, datetime.fromisoformat(saved_at) if saved_at else None
+
+    def worksheets(self):
+        names = (unquote(f[:-len(".arrow")]) for f in os.listdir(self.directory) if f.endswith(".arrow"))
+        return sorted(n for n in names if n not in self.exclude)
+
+    def seed(self, cache):
+        """Seed every snapshot into a SheetCache and start syncing them; returns the seeded names."""
+        seeded = []
+        for worksheet in self.worksheets():
+            loaded = self.load(worksheet)
+            if loaded and cache.seed(worksheet, *loaded): seeded.append(worksheet)
+        cache.sync(seeded)
+        return seeded
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import scoring
+
+# Materialized standings: one row per user, kept in its own worksheet and moved
+# by the points delta of whatever result was just published. Reading them is
+# O(users); the full rescoring in scoring.py is only the rebuild/verify path.
+
+def match_delta(p_df, new_rows, old_rows=None, rules=None):
+    """Per-user point change when the Results rows for some matches go from old_rows to new_rows."""
+    if p_df.empty: return pd.Series(dtype='int64')
+    rows = [new_rows] if old_rows is None or old_rows.empty else [new_rows, old_rows]
+    mids = pd.concat([r['Match_ID'] for r in rows])
+    p = p_df[p_df['Match_ID'].isin(mids)]
+    delta = scoring.user_totals(scoring.score_predictions(p, new_rows, rules))
+    if len(rows) > 1: delta = delta.sub(scoring.user_totals(scoring.score_predictions(p, old_rows, rules)), fill_value=0)
+    return delta
+
+def night_delta(subs, new_rows, old_rows=None, rules=None):
+    """Per-user point change when the PL_Results rows for some nights go from old_rows to new_rows."""
+    if subs.empty: return pd.Series(dtype='int64')
+    delta = scoring.user_totals(scoring.score_pl_submissions(subs, new_rows, rules))
+    if old_rows is not None and not old_rows.empty:
+        delta = delta.sub(scoring.user_totals(scoring.score_pl_submissions(subs, old_rows, rules)), fill_value=0)
+    return delta
+
+def apply_delta(standings, delta, col):
+    current = pd.to_numeric(standings.set_index('Username')[col]) if not standings.empty else pd.Series(dtype='int64')
+    current.index = current.index.astype(str)
+    totals = current.add(delta, fill_value=0).astype(int)
+    return totals.rename_axis('Username').rename(col).reset_index().sort_values(col, ascending=False)
+
+def with_users(standings, users, col):
+    """Standings limited to registered users, with a 0 row for everyone who has not scored yet."""
+    names = pd.unique(users['Username'].astype(str)) if not users.empty else []
+    if not standings.empty: standings = standings[standings['Username'].astype(str).isin(names)]
+    have = set(standings['Username'].astype(str)) if not standings.empty else set()
+    missing = [u for u in names if u not in have]
+    pad = pd.DataFrame({'Username': missing, col: 0})
+    return pd.concat([standings, pad], ignore_index=True).astype({col: int}).sort_values(col, ascending=False)
+
+def compare(standings, rebuilt, col):
+    """Rows where the materialized standings disagree with a from-scratch rebuild."""
+    if standings.empty: standings = pd.DataFrame(columns=['Username', col])
+    both = standings[['Username', col]].astype({'Username': str}).merge(rebuilt[['Username', col]], on='Username', how='outer', suffixes=('_stored', '_rebuilt'))
+    both = both.fillna(0)
+    return both[both[f"{col}_stored"].astype(int) != both[f"{col}_rebuilt"].astype(int)]
+
+# --- HISTORY ---
+# One snapshot per resulted match day (or PL night) in the "<Standings>_History" worksheets:
+# Day, Username, Points, Rank, Movement. A snapshot is the previous day's snapshot plus that
+# day's points, so writing one never rescans earlier results; rechain carries a rewrite forward.
+HISTORY_COLUMNS = ['Day', 'Username', 'Points', 'Rank', 'Movement']
+
+def previous(history, day, order=None):
+    """The latest snapshot before `day`; `order` lists days oldest first (default: sorted as text)."""
+    if history.empty: return history
+    days = order if order is not None else sorted(history['Day'].astype(str).unique())
+    earlier = days[:days.index(day)] if day in days else [d for d in days if d < day]
+    have = set(history['Day'].astype(str))
+    earlier = [d for d in earlier if d in have]
+    return history[history['Day'].astype(str) == earlier[-1]] if earlier else history.iloc[:0]
+
+def snapshot(prev, delta, day):
+    """Standings after `day`: prev's points plus the day's per-user delta, ranked, with movement.
+
+    Rank is 1 for the most points, ties share a rank (1, 2, 2, 4); Movement is places gained
+    since prev (0 for anyone who was not in it)."""
+    if prev.empty: prev = pd.DataFrame(columns=HISTORY_COLUMNS)
+    names = prev['Username'].astype(str)
+    before = pd.Series(pd.to_numeric(prev['Points']).to_numpy(), index=names, dtype='int64')
+    points = before.add(delta.astype('int64'), fill_value=0).astype('int64')
+    rank = points.rank(method='min', ascending=False).astype('int64')
+    old_rank = pd.Series(pd.to_numeric(prev['Rank']).to_numpy(), index=names, dtype='int64')
+    movement = (old_rank.reindex(rank.index) - rank).fillna(0).astype('int64')
+    out = pd.DataFrame({'Day': day, 'Username': points.index, 'Points': points.to_numpy(), 'Rank': rank.to_numpy(), 'Movement': movement.to_numpy()})
+    return out.sort_values(['Rank', 'Username'], kind='stable').reset_index(drop=True)
+
+def rechain(history, day, delta, order=None):
+    """The snapshot for `day` plus every later snapshot in history, rebuilt on top of it.
+
+    Writing `day` alone would leave later snapshots on the old totals after a correction, or
+    when a day completes after a later one. Each later day keeps its own points (the
+    difference between its stored snapshot and the one before it), so no results are rescanned."""
+    if history.empty: return snapshot(history, delta, day)
+    days = history['Day'].astype(str)
+    have = sorted(days.unique()) if order is None else [d for d in order if d in set(days)]
+    pos = order.index if order is not None and day in order else str
+    later = [d for d in have if pos(d) > pos(day)]
+    snaps = [snapshot(previous(history, day, order), delta, day)]
+    for d in later:
+        base = previous(history, d, order)
+        own = _points(history[days == d]).sub(_points(base), fill_value=0)
+        snaps.append(snapshot(snaps[-1], own, d))
+    return pd.concat(snaps, ignore_index=True)
+
+def _points(snap):
+    return pd.Series(pd.to_numeric(snap['Points']).to_numpy(), index=snap['Username'].astype(str), dtype='int64')
+
+def complete_days(day_of, results):
+    """Days, oldest first, on which every match has a result; day_of maps Match_ID -> day."""
+    if day_of.empty: return []
+    done = pd.Series(day_of.index.isin(results['Match_ID'] if not results.empty else []), index=day_of.to_numpy())
+    done = done.groupby(level=0).all()
+    return sorted(done.index[done.to_numpy()])
+
+def day_deltas(scored, day, days):
+    """[(day, per-user points)] for each of `days`, from a scored frame (score_predictions or
+    score_pl_submissions) and the day of each of its rows."""
+    rows = scored.groupby(np.asarray(day), sort=False).indices if not scored.empty else {}
+    return [(d, scoring.user_totals(scored.iloc[rows[d]]) if d in rows else pd.Series(dtype='int64')) for d in days]
+
+def arrow(movement):
+    return f"▲{movement}" if movement > 0 else f"▼{-movement}" if movement < 0 else "–"
+
+def replay(deltas):
+    """Every snapshot from scratch, given [(day, delta)] oldest first (the rebuild path)."""
+    prev, snaps = pd.DataFrame(columns=HISTORY_COLUMNS), []
+    for day, delta in deltas:
+        prev = snapshot(prev, delta, day)
+        snaps.append(prev)
+    return pd.concat(snaps, ignore_index=True) if snaps else pd.DataFrame(columns=HISTORY_COLUMNS)
@@ -0,0 +1,403 @@
+import os
+import sqlite3
+import threading
+import re
+import time
+from collections import defaultdict
+from itertools import zip_longest
+from datetime import date, datetime
+import pandas as pd
+
+# --- SHEET BACKENDS ---
+# Every backend offers the same five calls on named worksheets:
+#   read(ws) -> DataFrame              write(ws, df)  (replace the whole sheet)
+#   append(ws, rows)                   upsert(ws, rows, cols)  (replace rows with the same key)
+#   query(ws, cols, keys) -> rows whose key columns match one of the key tuples
+INDEXED = ("Username", "Match_ID", "Night")
+
+# --- PARTITIONS ---
+# Per-league copies of a worksheet are named "<sheet>@<league>"; the default league ("") keeps
+# the plain name, so sheets from before leagues existed are simply the default league's partition.
+def partition(worksheet, league):
+    return f"{worksheet}@{league}" if league else worksheet
+
+def base_sheet(worksheet):
+    return worksheet.split("@", 1)[0]
+
+def _missing(e):
+    # KeyError from SQLite/FakeConnection, gspread's WorksheetNotFound from Google Sheets
+    return isinstance(e, KeyError) or type(e).__name__ == "WorksheetNotFound"
+
+class GSheetsBackend:
+    def __init__(self, conn, spreadsheet):
+        self.conn = conn
+        self.spreadsheet = spreadsheet
+
+    def read(self, worksheet):
+        return self.conn.read(spreadsheet=self.spreadsheet, worksheet=worksheet, ttl=0).dropna(how='all')
+
+    def write(self, worksheet, df):
+        try: self.conn.update(spreadsheet=self.spreadsheet, worksheet=worksheet, data=df)
+        except Exception as e:
+            # A new league's partition, or a sheet added after launch (Standings, Reminders, ...):
+            # add the worksheet through gspread, then write it. (conn.create rejects spreadsheet=.)
+            if not _missing(e): raise
+            self._worksheet(worksheet)
+            self.conn.update(spreadsheet=self.spreadsheet, worksheet=worksheet, data=df)
+
+    def append(self, worksheet, rows):
+        """Add rows under the existing data with one append request that never touches other rows.
+
+        A missing worksheet is created and columns the header lacks are added to row 1 first, so
+        no path reads the sheet and rewrites it (which could drop another process's rows)."""
+        ws, header = self._prepare(worksheet, rows)
+        resp = ws.append_rows(_cells(rows, header), value_input_option="USER_ENTERED")
+        # The append response says how many rows landed, so callers need no read-back.
+        updated = resp.get("updates", {}).get("updatedRows") if isinstance(resp, dict) else None
+        if updated is not None and updated != len(rows): raise RuntimeError(f"{worksheet}: appended {updated} of {len(rows)} rows")
+
+    def upsert(self, worksheet, rows, cols):
+        """Replace the rows whose key matches, in place: a key's old rows are overwritten one for one,
+        any extra old rows are blanked (read() drops empty rows) and extra new rows are appended."""
+        ws, header = self._prepare(worksheet, rows)
+        at = defaultdict(list)
+        for r, key in enumerate(zip_longest(*[_norm(ws.col_values(header.index(c) + 1)[1:]) for c in cols], fillvalue=""), start=2): at[key].append(r)
+        updates, extra = [], []
+        for key, group in rows.assign(_key=row_keys(rows, cols)).groupby('_key', sort=False):
+            slots, cells = at.get(key, []), _cells(group.drop(columns='_key'), header)
+            updates += [{"range": f"A{r}", "values": [c]} for r, c in zip(slots, cells)]
+            updates += [{"range": f"A{r}", "values": [[""] * len(header)]} for r in slots[len(cells):]]
+            extra += cells[len(slots):]
+        if updates: ws.batch_update(updates, value_input_option="USER_ENTERED")
+        if extra: ws.append_rows(extra, value_input_option="USER_ENTERED")
+
+    def _worksheet(self, worksheet):
+        """The gspread worksheet behind a sheet (service-account auth), added if it does not exist yet."""
+        client = getattr(self.conn, 'client', None)
+        if not hasattr(client, '_select_worksheet'): raise RuntimeError(f"{worksheet}: row-level writes need service-account auth")
+        try: return client._select_worksheet(spreadsheet=self.spreadsheet, worksheet=worksheet)
+        except Exception as e:
+            if not _missing(e): raise
+        # Another process may add it at the same moment; whichever add wins, the select below finds it.
+        try: client._open_spreadsheet(spreadsheet=self.spreadsheet).add_worksheet(title=worksheet, rows=1, cols=26)
+        except Exception: pass
+        return client._select_worksheet(spreadsheet=self.spreadsheet, worksheet=worksheet)
+
+    def _prepare(self, worksheet, rows):
+        # Only row 1 is ever rewritten here, and only to add the columns `rows` bring.
+        ws = self._worksheet(worksheet)
+        header = ws.row_values(1)
+        new = [c for c in map(str, rows.columns) if c not in header]
+        if new:
+            header = header + new
+            if len(header) > getattr(ws, 'col_count', len(header)): ws.add_cols(len(header) - ws.col_count)
+            ws.update("A1", [header])
+        return ws, header
+
+    def query(self, worksheet, cols, keys):
+        df = self._read_or_empty(worksheet)
+        wanted = set(keys)
+        return df[[k in wanted for k in row_keys(df, cols)]] if not df.empty else df
+
+    def _read_or_empty(self, worksheet):
+        try: return self.read(worksheet)
+        except Exception as e:
+            if not _missing(e): raise
+            return pd.DataFrame()
+
+class SQLiteBackend:
+    """Worksheets as tables in one SQLite file, indexed on Username, Match_ID and Night.
+
+    Cells are stored as text the way a sheet would show them (whole-number floats lose
+    their ".0"), so keys compare equal whichever backend wrote them."""
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+
+    def read(self, worksheet):
+        with self._lock:
+            if not self._columns(worksheet): raise KeyError(f"Worksheet not found: {worksheet}")
+            return pd.read_sql_query(f"SELECT * FROM {_q(worksheet)} ORDER BY rowid", self.db).dropna(how='all')
+
+    def write(self, worksheet, df):
+        with self._lock, self.db:
+            self.db.execute(f"DROP TABLE IF EXISTS {_q(worksheet)}")
+            self._insert(worksheet, df)
+
+    def append(self, worksheet, rows):
+        with self._lock, self.db: self._insert(worksheet, rows)
+
+    def upsert(self, worksheet, rows, cols):
+        with self._lock, self.db:
+            if self._columns(worksheet): self._delete(worksheet, cols, row_keys(rows, cols))
+            self._insert(worksheet, rows)
+
+    def query(self, worksheet, cols, keys):
+        with self._lock:
+            if not self._columns(worksheet): return pd.DataFrame()
+            where = " AND ".join(f"{_q(c)} = ?" for c in cols)
+            frames = [pd.read_sql_query(f"SELECT * FROM {_q(worksheet)} WHERE {where}", self.db, params=list(k)) for k in keys]
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=self._columns(worksheet))
+
+    def _columns(self, worksheet):
+        return [r[1] for r in self.db.execute(f"PRAGMA table_info({_q(worksheet)})")]
+
+    def _insert(self, worksheet, df):
+        df = df.rename(columns=str)
+        cols = self._columns(worksheet)
+        if not cols:
+            self.db.execute(f"CREATE TABLE {_q(worksheet)} ({', '.join(_q(c) + ' TEXT' for c in df.columns)})")
+            cols = list(df.columns)
+        for c in df.columns:
+            if c not in cols: self.db.execute(f"ALTER TABLE {_q(worksheet)} ADD COLUMN {_q(c)} TEXT"); cols.append(c)
+        for c in INDEXED:
+            if c in cols: self.db.execute(f"CREATE INDEX IF NOT EXISTS {_q(f'ix_{worksheet}_{c}')} ON {_q(worksheet)} ({_q(c)})")
+        if df.empty: return
+        values = [[_text(v) for v in row] for row in df.astype(object).itertuples(index=False)]
+        self.db.executemany(f"INSERT INTO {_q(worksheet)} ({', '.join(map(_q, df.columns))}) VALUES ({', '.join('?' * len(df.columns))})", values)
+
+    def _delete(self, worksheet, cols, keys):
+        where = " AND ".join(f"{_q(c)} = ?" for c in cols)
+        self.db.executemany(f"DELETE FROM {_q(worksheet)} WHERE {where}", [list(k) for k in keys])
+
+def _q(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _text(v):
+    if v is None or (not isinstance(v, str) and pd.isna(v)): return None
+    if isinstance(v, float) and v.is_integer(): return str(int(v))
+    return str(v)
+
+def backend_from_config(config, gsheets):
+    """Pick the storage engine from the [storage] secrets table (or DARTS_STORAGE).
+
+    config: mapping like st.secrets["storage"], e.g. {"backend": "sqlite", "path": "darts.db"}.
+    gsheets: zero-arg callable returning (conn, spreadsheet) for the default Google Sheets backend."""
+    kind = os.environ.get("DARTS_STORAGE") or config.get("backend", "gsheets")
+    if kind == "sqlite": return SQLiteBackend(os.environ.get("DARTS_DB") or config.get("path", "darts.db"))
+    if kind != "gsheets": raise ValueError(f"Unknown storage backend: {kind}")
+    return GSheetsBackend(*gsheets())
+
+def _cells(rows, header):
+    def cell(v):
+        if v is None or (not isinstance(v, str) and pd.isna(v)): return ""
+        if isinstance(v, (datetime, date)): return str(v)
+        return v.item() if hasattr(v, 'item') else v
+    return [[cell(v) for v in row] for row in rows.reindex(columns=header).astype(object).itertuples(index=False)]
+
+class FakeConnection:
+    """In-memory stand-in for GSheetsConnection, for local runs, benchmarks and tests.
+
+    read/update/create behave like the connection's; `client` hands out FakeWorksheets with the
+    handful of gspread Worksheet calls GSheetsBackend uses for row-level writes."""
+    def __init__(self, sheets=None, latency=0.0):
+        self.sheets = {name: df.copy() for name, df in (sheets or {}).items()}
+        self.latency = latency
+        self.reads = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+        self.client = _FakeClient(self)
+
+    def read(self, spreadsheet=None, worksheet=None, ttl=None, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            self.reads += 1
+            if worksheet not in self.sheets: raise KeyError(f"Worksheet not found: {worksheet}")
+            return self.sheets[worksheet].copy()
+
+    def update(self, spreadsheet=None, worksheet=None, data=None, **kwargs):
+        time.sleep(self.latency)
+        with self._lock:
+            self.writes += 1
+            self.sheets[worksheet] = pd.DataFrame(data).reset_index(drop=True).copy()
+        return data
+
+    def create(self, spreadsheet=None, worksheet=None, data=None, **kwargs):
+        # Like the service-account client, which rejects an explicit spreadsheet here.
+        if spreadsheet: raise ValueError("Spreadsheet must be specified")
+        return self.update(worksheet=worksheet, data=data)
+
+class WorksheetNotFound(KeyError):
+    pass
+
+class _FakeClient:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def _select_worksheet(self, spreadsheet=None, worksheet=None, **kwargs):
+        with self.conn._lock:
+            if worksheet not in self.conn.sheets: raise WorksheetNotFound(worksheet)
+        return FakeWorksheet(self.conn, worksheet)
+
+    def _open_spreadsheet(self, spreadsheet=None, **kwargs):
+        return self
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        with self.conn._lock:
+            if title in self.conn.sheets: raise ValueError(f'A sheet with the name "{title}" already exists.')
+            self.conn.sheets[title] = pd.DataFrame()
+        return FakeWorksheet(self.conn, title)
+
+class FakeWorksheet:
+    """The gspread Worksheet calls used by GSheetsBackend, each one atomic like a Sheets API request."""
+    col_count = 26 ** 2
+
+    def __init__(self, conn, title):
+        self.conn = conn
+        self.title = title
+
+    def _call(self, fn):
+        time.sleep(self.conn.latency)
+        with self.conn._lock:
+            self.conn.writes += 1
+            return fn(self.conn.sheets[self.title])
+
+    def row_values(self, row):
+        assert row == 1
+        return self._call(lambda df: list(map(str, df.columns)))
+
+    def col_values(self, col):
+        return self._call(lambda df: [str(df.columns[col - 1])] + ["" if v is None or (not isinstance(v, str) and pd.isna(v)) else str(v) for v in df.iloc[:, col - 1]])
+
+    def update(self, range_name, values=None, **kwargs):
+        self.batch_update([{"range": range_name, "values": values}])
+
+    def batch_update(self, data, **kwargs):
+        def apply(df):
+            df = df.astype(object)
+            for d in data:
+                col, row = _a1(d["range"])
+                for i, cells in enumerate(d["values"]):
+                    # Row 1 is the header: only ever extended with new columns.
+                    if row + i == 1: df = df.reindex(columns=list(df.columns) + [c for c in cells if c not in df.columns])
+                    else:
+                        for j, v in enumerate(cells): df.iat[row + i - 2, col + j] = None if v == "" else v
+            self.conn.sheets[self.title] = df
+        self._call(apply)
+
+    def append_rows(self, values, value_input_option="RAW", **kwargs):
+        def apply(df):
+            new = pd.DataFrame([[None if v == "" else v for v in row] for row in values], columns=list(df.columns[:len(values[0])]) if values else [])
+            self.conn.sheets[self.title] = pd.concat([df.astype(object), new.astype(object)], ignore_index=True) if len(df) else new.reindex(columns=df.columns)
+        self._call(apply)
+
+    def add_cols(self, cols):
+        pass
+
+def _a1(cell):
+    # "C5" -> (2, 5): zero-based column, one-based row
+    letters, row = re.fullmatch(r"([A-Z]+)(\d+)", cell).groups()
+    col = 0
+    for ch in letters: col = col * 26 + ord(ch) - 64
+    return col - 1, int(row)
+
+# --- WRITE QUEUE ---
+# Idempotency key per worksheet: a second row with the same key is never written.
+WRITE_KEYS = {"Predictions": ["Username", "Match_ID"], "User_Submissions": ["Username", "Night"], "Users": ["Username"], "Reminders": ["Date", "Username"]}
+
+def row_keys(df, cols):
+    if df.empty or any(c not in df.columns for c in cols): return []
+    return list(zip(*[_norm(df[c]) for c in cols]))
+
+def _norm(values):
+    # Key cells compare as the sheet shows them: stripped text, whole-number floats without ".0".
+    return pd.Series(values, dtype=object).astype(str).str.strip().str.replace(r'\.0$', '', regex=True).tolist()
+
+class _Ticket:
+    def __init__(self, key):
+        self.key = key
+        self.done = threading.Event()
+        self.written = False
+        self.attempted = False
+        self.error = None
+
+class WriteQueue:
+    """Process-wide appender shared by every session.
+
+    submit() queues rows and returns once they are in the sheet. Whichever caller gets the
+    worksheet's flush lock writes everything queued so far as one append, so submissions that
+    arrive together share one request. Rows whose key is already known are reported as not
+    written, without reading the sheet: known keys are the ones this queue has appended plus
+    those in known(worksheet), a frame already in memory (the apps pass SheetCache.peek). Only
+    after a failed append is the sheet queried, for the rows that may have landed anyway. Retries
+    back off outside the flush lock, so other sessions keep writing meanwhile.
+
+    Idempotency therefore holds within one process; a row another process appended is only seen
+    once this process's copy of the sheet has been reloaded."""
+    def __init__(self, backend, keys=WRITE_KEYS, retries=3, backoff=0.5, on_write=None, known=None):
+        self.backend = backend
+        self.keys = keys
+        self.on_write = on_write
+        self.known = known
+        self.retries = retries
+        self.backoff = backoff
+        self._pending = defaultdict(list)
+        self._written = defaultdict(set)
+        self._lock = threading.Lock()
+        self._flush_locks = defaultdict(threading.Lock)
+
+    def submit(self, worksheet, row):
+        return self.submit_many(worksheet, [row])[0]
+
+    def submit_many(self, worksheet, rows):
+        """Queue dict rows for one worksheet; returns one bool per row, False if its key already existed."""
+        cols = self.keys[base_sheet(worksheet)]
+        tickets = [_Ticket(k) for k in row_keys(pd.DataFrame(rows, columns=list(rows[0])), cols)] if rows else []
+        with self._lock:
+            self._pending[worksheet].extend(zip(rows, tickets))
+            flush_lock = self._flush_locks[worksheet]
+        for attempt in range(self.retries):
+            if attempt: time.sleep(self.backoff * 2 ** (attempt - 1))
+            with flush_lock:
+                if not all(t.done.is_set() for t in tickets): self._flush(worksheet)
+            if all(t.done.is_set() for t in tickets): break
+        else:
+            # Out of retries: take our rows back out of the queue so nobody writes them after we report failure.
+            with flush_lock, self._lock:
+                mine = set(map(id, tickets))
+                self._pending[worksheet] = [(r, t) for r, t in self._pending[worksheet] if id(t) not in mine]
+        for t in tickets:
+            if not t.done.is_set(): raise t.error or RuntimeError(f"{worksheet}: row {t.key} was not persisted")
+        return [t.written for t in tickets]
+
+    def upsert(self, worksheet, rows, cols):
+        """Replace rows by key (e.g. a rehashed password) while holding the worksheet's flush lock,
+        so it is ordered with this process's queued appends to the same sheet."""
+        with self._lock: flush_lock = self._flush_locks[worksheet]
+        with flush_lock:
+            try: self.backend.upsert(worksheet, rows, cols)
+            finally:
+                if self.on_write: self.on_write(worksheet)
+
+    def _flush(self, worksheet):
+        # One attempt at everything queued; rows of a failed append go back to the front of the queue.
+        with self._lock: batch, self._pending[worksheet] = self._pending[worksheet], []
+        if not batch: return
+        cols = self.keys[base_sheet(worksheet)]
+        existing = set(self._written[worksheet])
+        frame = self.known(worksheet) if self.known else None
+        if frame is not None: existing.update(row_keys(frame, cols))
+        retried = [t.key for _, t in batch if t.attempted]
+        try:
+            landed = set(row_keys(self.backend.query(worksheet, cols, retried), cols)) if retried else set()
+        except Exception as e:
+            return self._requeue(worksheet, batch, e)
+        todo, seen = [], set()
+        for row, t in batch:
+            if t.key in landed: t.written = True; t.done.set(); self._written[worksheet].add(t.key)
+            elif t.key in existing or t.key in seen: t.done.set()
+            else: seen.add(t.key); todo.append((row, t))
+        if not todo: return
+        for _, t in todo: t.attempted = True
+        try:
+            self.backend.append(worksheet, pd.DataFrame([row for row, _ in todo]))
+        except Exception as e:
+            return self._requeue(worksheet, todo, e)
+        finally:
+            if self.on_write: self.on_write(worksheet)
+        self._written[worksheet].update(t.key for _, t in todo)
+        for _, t in todo: t.written = True; t.done.set()
+
+    def _requeue(self, worksheet, batch, error):
+        for _, t in batch: t.error = error
+        with self._lock: self._pending[worksheet][:0] = [(r, t) for r, t in batch if not t.done.is_set()]
@@ -0,0 +1,142 @@
+"""Timing spans and counters for the hot paths, kept in memory and optionally appended to a JSON-lines log.
+
+Event kinds used by the apps:
+    sheet    one backend call (read/write/append/upsert/query): worksheet, rows, bytes, ms
+    cache    get_data lookups, counted per worksheet and result (hit / stale / miss); not logged
+             one by one, each rerun event carries its own hits / stale / misses totals
+    compute  a scoring or standings rebuild
+    prefetch the worksheets a page declares, fetched together before it renders
+    page     the body of one page (Predictions, Leaderboard, ...)
+    fragment one run of a fragment (a match card, the PL bracket), inside a full rerun or on its own
+    rerun    one whole script run, start to finish
+
+A span that never finishes (st.rerun / st.stop raise out of the script) is simply not recorded."""
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+class Span:
+    def __init__(self, recorder, kind, name, fields):
+        self.recorder = recorder
+        self.event = {"kind": kind, "name": name, **fields}
+        self.start = time.perf_counter()
+
+    def end(self, **fields):
+        self.event.update(fields)
+        self.event["ms"] = round((time.perf_counter() - self.start) * 1000, 3)
+        self.recorder.record(self.event)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end(**({"error": exc_type.__name__} if exc_type else {}))
+
+class Recorder:
+    """Process-wide event sink. Keeps the last `keep` events for the diagnostics panel and,
+    when `path` is set, appends every event to it as one JSON object per line. The log stays
+    open between events and is rotated to `<path>.1` once it would pass max_bytes, so it never
+    holds more than about 2 x max_bytes on disk."""
+    def __init__(self, path=None, keep=20000, max_bytes=10 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.events = deque(maxlen=keep)
+        self.counters = Counter()
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._file = None
+        self._local = threading.local()
+
+    def span(self, kind, name, **fields):
+        return Span(self, kind, name, fields)
+
+    def count(self, kind, name, result=""):
+        with self._lock: self.counters[(kind, name, result)] += 1
+        tally = getattr(self._local, 'tally', None)
+        if tally is None: tally = self._local.tally = Counter()
+        tally[result] += 1
+
+    def tally(self):
+        """Counts this thread made since its last tally() (a Streamlit rerun runs on one thread)."""
+        tally, self._local.tally = getattr(self._local, 'tally', None) or Counter(), Counter()
+        return dict(tally)
+
+    def record(self, event):
+        event = {"ts": datetime.now().isoformat(timespec="milliseconds"), **event}
+        with self._lock: self.events.append(event)
+        if self.path: self._write(json.dumps(event, default=str) + "\n")
+
+    def _write(self, line):
+        # Its own lock, so file I/O never holds up counters or the in-memory events.
+        with self._file_lock:
+            if not self.path: return
+            try:
+                if self._file is None: self._file = open(self.path, "a", buffering=1)
+                if self._file.tell() and self._file.tell() + len(line) > self.max_bytes:
+                    self._file.close()
+                    os.replace(self.path, self.path + ".1")
+                    self._file = open(self.path, "a", buffering=1)
+                self._file.write(line)
+            except OSError:
+                self.path, self._file = None, None
+
+    def close(self):
+        with self._file_lock:
+            if self._file: self._file.close()
+            self._file = None
+
+    def frame(self):
+        with self._lock: return pd.DataFrame(list(self.events))
+
+    def percentiles(self):
+        """Latency percentiles in ms per (kind, name) for every timed event."""
+        df = self.frame()
+        if df.empty or "ms" not in df.columns: return pd.DataFrame(columns=["Kind", "Name", "Count", "p50", "p90", "p99", "Max"])
+        df = df.dropna(subset=["ms"])
+        rows = [{"Kind": kind, "Name": name, "Count": len(g), **{f"p{q}": round(float(np.percentile(g["ms"], q)), 1) for q in (50, 90, 99)}, "Max": round(float(g["ms"].max()), 1)}
+                for (kind, name), g in df.groupby(["kind", "name"], sort=True)]
+        return pd.DataFrame(rows)
+
+    def counts(self):
+        with self._lock: items = list(self.counters.items())
+        return pd.DataFrame([{"Kind": k, "Name": n, "Result": r, "Count": c} for (k, n, r), c in sorted(items)],
+                            columns=["Kind", "Name", "Result", "Count"])
+
+def _size(df):
+    try: return int(df.memory_usage(deep=True).sum())
+    except Exception: return None
+
+class InstrumentedBackend:
+    """Wraps any storage backend and records a "sheet" span around each of its five calls."""
+    def __init__(self, backend, recorder):
+        self.backend = backend
+        self.recorder = recorder
+
+    def read(self, worksheet):
+        with self.recorder.span("sheet", f"read {worksheet}", worksheet=worksheet) as s:
+            df = self.backend.read(worksheet)
+            s.event.update(rows=len(df), bytes=_size(df))
+        return df
+
+    def write(self, worksheet, df):
+        with self.recorder.span("sheet", f"write {worksheet}", worksheet=worksheet, rows=len(df), bytes=_size(df)):
+            self.backend.write(worksheet, df)
+
+    def append(self, worksheet, rows):
+        with self.recorder.span("sheet", f"append {worksheet}", worksheet=worksheet, rows=len(rows), bytes=_size(rows)):
+            self.backend.append(worksheet, rows)
+
+    def upsert(self, worksheet, rows, cols):
+        with self.recorder.span("sheet", f"upsert {worksheet}", worksheet=worksheet, rows=len(rows), bytes=_size(rows)):
+            self.backend.upsert(worksheet, rows, cols)
+
+    def query(self, worksheet, cols, keys):
+        with self.recorder.span("sheet", f"query {worksheet}", worksheet=worksheet, keys=len(keys)) as s:
+            df = self.backend.query(worksheet, cols, keys)
+            s.event.update(rows=len(df))
+        return df
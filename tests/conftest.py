@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The apps are flat modules in the repository root (import scoring, import storage, ...).
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+import storage
+
+# The same behaviour is expected from every storage engine.
+@pytest.fixture(params=["gsheets", "sqlite"])
+def backend(request):
+    if request.param == "gsheets": return storage.GSheetsBackend(storage.FakeConnection(), "test")
+    return storage.SQLiteBackend(":memory:")
+
+def cells(df, cols):
+    return [tuple(r) for r in storage.row_keys(df, cols)]
+
+def test_write_then_read(backend):
+    backend.write("Results", pd.DataFrame({"Match_ID": [1.0, 2.0], "Score": ["6-2", "3-6"]}))
+    assert cells(backend.read("Results"), ["Match_ID", "Score"]) == [("1", "6-2"), ("2", "3-6")]
+
+def test_read_missing_sheet_raises(backend):
+    with pytest.raises(Exception) as e: backend.read("Nope")
+    assert storage._missing(e.value)
+
+def test_append(backend):
+    backend.write("Predictions", pd.DataFrame({"Username": ["a"], "Match_ID": [1], "Score": ["6-2"]}))
+    backend.append("Predictions", pd.DataFrame({"Username": ["b", "c"], "Match_ID": [1, 2], "Score": ["2-6", "6-0"]}))
+    backend.append("Fresh", pd.DataFrame({"Username": ["a"], "Match_ID": [5]}))
+    assert cells(backend.read("Predictions"), ["Username", "Match_ID", "Score"]) == [("a", "1", "6-2"), ("b", "1", "2-6"), ("c", "2", "6-0")]
+    assert cells(backend.read("Fresh"), ["Username", "Match_ID"]) == [("a", "5")]
+
+def test_upsert(backend):
+    backend.write("Results", pd.DataFrame({"Match_ID": [1, 2], "Score": ["6-2", "3-6"]}))
+    backend.upsert("Results", pd.DataFrame({"Match_ID": [2, 3], "Score": ["6-5", "1-6"]}), ["Match_ID"])
+    backend.upsert("Standings_History", pd.DataFrame({"Day": ["d1", "d1"], "Username": ["a", "b"]}), ["Day"])
+    backend.upsert("Standings_History", pd.DataFrame({"Day": ["d1"], "Username": ["c"]}), ["Day"])
+    assert sorted(cells(backend.read("Results"), ["Match_ID", "Score"])) == [("1", "6-2"), ("2", "6-5"), ("3", "1-6")]
+    assert cells(backend.read("Standings_History"), ["Day", "Username"]) == [("d1", "c")]
+
+def test_query(backend):
+    backend.write("Predictions", pd.DataFrame({"Username": ["a", "a", "b"], "Match_ID": [1, 2, 1], "Score": ["6-2", "6-1", "0-6"]}))
+    hit = backend.query("Predictions", ["Username", "Match_ID"], [("a", "2"), ("b", "1"), ("z", "9")])
+    assert sorted(cells(hit, ["Username", "Match_ID", "Score"])) == [("a", "2", "6-1"), ("b", "1", "0-6")]
+    assert backend.query("Missing", ["Username"], [("a",)]).empty
+
+def test_write_queue_is_idempotent(backend):
+    queue = storage.WriteQueue(backend, backoff=0.01)
+    assert queue.submit("Predictions", {"Username": "a", "Match_ID": 1, "Score": "6-2"})
+    assert not queue.submit("Predictions", {"Username": "a", "Match_ID": 1.0, "Score": "0-6"})
+    assert queue.submit_many("Predictions", [{"Username": "a", "Match_ID": 2, "Score": "6-3"}, {"Username": "a", "Match_ID": 2, "Score": "1-6"},
+                                             {"Username": "a", "Match_ID": 1, "Score": "6-6"}]) == [True, False, False]
+    assert cells(backend.read("Predictions"), ["Username", "Match_ID", "Score"]) == [("a", "1", "6-2"), ("a", "2", "6-3")]
+
+def test_write_queue_partitions(backend):
+    queue = storage.WriteQueue(backend, backoff=0.01)
+    assert queue.submit(storage.partition("User_Submissions", "office"), {"Username": "a", "Night": "Night 1", "Final": "x"})
+    assert not queue.submit(storage.partition("User_Submissions", "office"), {"Username": "a", "Night": "Night 1", "Final": "y"})
+    assert cells(backend.read("User_Submissions@office"), ["Username", "Night", "Final"]) == [("a", "Night 1", "x")]
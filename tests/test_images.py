@@ -0,0 +1,61 @@
+import functools
+import http.server
+import os
+import shutil
+import threading
+import pytest
+from PIL import Image
+import images
+
+@pytest.fixture
+def server(tmp_path):
+    """A local HTTP server for the source photos; yields (base url, list of requested paths)."""
+    root = tmp_path / "src"; root.mkdir()
+    for i in range(4): Image.effect_noise((900, 600), 40 + i * 10).convert("RGB").save(root / f"p{i}.jpg", quality=95)
+    shutil.copy(root / "p0.jpg", root / "dup.jpg")
+    (root / "notimg.jpg").write_text("hello")
+    hits = []
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, *args): hits.append(self.path)
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(root)))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}", hits
+    srv.shutdown()
+
+def test_a_photo_is_fetched_once_and_served_from_the_directory(server, tmp_path):
+    base, hits = server
+    cache = images.ThumbnailCache(str(tmp_path / "thumbs"), "app/static/thumbs")
+    served = cache.get(f"{base}/p0.jpg")
+    assert cache.get(f"{base}/p0.jpg") == served and hits.count("/p0.jpg") == 1
+    # Cards get a stable URL, not the bytes, so the browser can cache the file.
+    assert served.startswith("app/static/thumbs/") and served.endswith(".webp")
+    with Image.open(tmp_path / "thumbs" / served.rsplit("/", 1)[1]) as img:
+        assert img.format == "WEBP" and max(img.size) <= 240
+    # Same picture under another URL shares the file.
+    assert cache.get(f"{base}/dup.jpg") == served
+
+def test_failures_get_the_placeholder_and_are_not_refetched(server, tmp_path):
+    base, hits = server
+    cache = images.ThumbnailCache(str(tmp_path / "thumbs"), "app/static/thumbs")
+    assert cache.get(f"{base}/missing.jpg") == images.PLACEHOLDER
+    assert cache.get(f"{base}/notimg.jpg") == images.PLACEHOLDER
+    n = len(hits)
+    assert cache.get(f"{base}/missing.jpg") == images.PLACEHOLDER and len(hits) == n
+    assert cache.get(None) == images.PLACEHOLDER and cache.get("nan") == images.PLACEHOLDER
+
+def test_thumbnails_survive_a_restart(server, tmp_path):
+    base, hits = server
+    served = images.ThumbnailCache(str(tmp_path / "thumbs"), "app/static/thumbs").get(f"{base}/p1.jpg")
+    n = len(hits)
+    assert images.ThumbnailCache(str(tmp_path / "thumbs"), "app/static/thumbs").get(f"{base}/p1.jpg") == served and len(hits) == n
+
+def test_least_recently_used_thumbnails_are_evicted(server, tmp_path):
+    base, _ = server
+    probe = images.ThumbnailCache(str(tmp_path / "probe"), "x")
+    probe.warm([f"{base}/p{i}.jpg" for i in range(4)])
+    one = max(e["bytes"] for e in probe._index.values())
+    cache = images.ThumbnailCache(str(tmp_path / "thumbs"), "x", max_bytes=int(one * 2.5))
+    for i in range(4): cache.get(f"{base}/p{i}.jpg"); cache._index[f"{base}/p{i}.jpg"]["used"] = i
+    assert cache.total_bytes() <= cache.max_bytes
+    assert f"{base}/p3.jpg" in cache._index and f"{base}/p0.jpg" not in cache._index
+    assert len([f for f in os.listdir(tmp_path / "thumbs") if f.endswith(".webp")]) == len(cache._index)
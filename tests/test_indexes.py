@@ -0,0 +1,18 @@
+import pandas as pd
+import indexes
+import standings
+
+def test_rank_index_uses_the_same_ranks_as_the_history_snapshots():
+    lb = pd.DataFrame({"Username": ["dan", "ann", "bob", "cat", "eve"], "Current Points": [1, 9, 5, 5, 5]})
+    ranks = indexes.RankIndex(lb)
+    assert ranks.table['Rank'].tolist() == [1, 2, 2, 2, 5]
+    assert ranks.usernames == ["ann", "bob", "cat", "eve", "dan"]
+    snap = standings.snapshot(pd.DataFrame(), lb.set_index('Username')['Current Points'], "2026-03-01")
+    assert {u: ranks.rank(u) for u in ranks.usernames} == dict(zip(snap['Username'], snap['Rank']))
+
+def test_rank_index_windows():
+    ranks = indexes.RankIndex(pd.DataFrame({"Username": list("abcdef"), "Total": [6, 5, 4, 3, 2, 1]}), "Total")
+    assert ranks.around("d", 1)['Username'].tolist() == ["c", "d", "e"]
+    assert ranks.rows(4)['Rank'].tolist() == [5, 6]
+    assert ranks.rank("zed") is None and not len(ranks.around("zed"))
+    assert not len(indexes.RankIndex(pd.DataFrame()))
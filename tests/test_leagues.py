@@ -0,0 +1,21 @@
+import pandas as pd
+import leagues
+
+def test_names_that_pass_for_the_main_league_or_all_leagues_are_refused():
+    for name in ("Main League", "main-league", " MAIN ", "Default", "All", "All Leagues"):
+        assert leagues.invalid(name), name
+    assert leagues.invalid("!!!")
+
+def test_blank_and_ordinary_names_are_fine():
+    assert leagues.invalid("") is None
+    assert leagues.invalid("  ") is None
+    assert leagues.invalid("Office Darts!") is None
+    assert leagues.slug("Office Darts!") == "office-darts"
+    assert leagues.label("office-darts") == "Office Darts"
+
+def test_membership_defaults_blank_leagues_to_the_main_league():
+    users = pd.DataFrame({"Username": ["ann", "bob"], "League": ["Office Darts", None]})
+    members = leagues.Membership(users)
+    assert members.league("ann") == "office-darts"
+    assert members.league("bob") == leagues.DEFAULT
+    assert members.leagues == [leagues.DEFAULT, "office-darts"]
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+import pandas as pd
+import reminders
+import storage
+
+DAY = datetime(2026, 3, 5)
+
+class FakePool:
+    sent = []
+    def __init__(self, settings): pass
+    def send(self, msg):
+        if msg['To'].startswith("bounce"): raise OSError("mailbox unavailable")
+        FakePool.sent.append(msg['To'])
+    def close(self): pass
+
+class BrokenWriter:
+    def submit(self, worksheet, row): raise KeyError(f"Worksheet not found: {worksheet}")
+
+def sheets():
+    return {"Users": pd.DataFrame({"Username": ["a", "b", "c", "bounce"], "Email": ["a@x", "b@x", "", "bounce@x"]}),
+            "Matches": pd.DataFrame({"Match_ID": [1, 2], "Date": [str(DAY + timedelta(hours=19)), str(DAY + timedelta(days=1))], "Player1": ["p", "q"], "Player2": ["r", "s"]}),
+            "Predictions": pd.DataFrame({"Username": ["b"], "Match_ID": [1], "Score": ["6-2"]})}
+
+def test_reminders_are_recorded_and_not_resent(monkeypatch):
+    monkeypatch.setattr(reminders, "SMTPPool", FakePool); FakePool.sent = []
+    backend = storage.GSheetsBackend(storage.FakeConnection(sheets()), "test")
+    msg = reminders.run(backend, reminders.SMTPSettings(), day=DAY.date(), rate=0)
+    assert FakePool.sent == ["a@x"] and "bounce" in msg and "Failed" in msg
+    assert backend.read("Reminders")['Username'].tolist() == ["a"]
+    reminders.run(backend, reminders.SMTPSettings(), day=DAY.date(), rate=0)
+    assert FakePool.sent == ["a@x"]
+
+def test_recording_failure_is_reported_per_user(monkeypatch):
+    monkeypatch.setattr(reminders, "SMTPPool", FakePool); FakePool.sent = []
+    backend = storage.GSheetsBackend(storage.FakeConnection(sheets()), "test")
+    msg = reminders.run(backend, reminders.SMTPSettings(), day=DAY.date(), rate=0, writer=BrokenWriter())
+    assert FakePool.sent == ["a@x"]
+    assert msg.startswith("Success: 1 reminders sent.") and "Sent but not recorded" in msg and "a (" in msg
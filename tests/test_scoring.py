@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+import schema
+import scoring
+import workload
+
+# The scorers as they were before vectorizing (app.py get_leaderboard_data, pl_darts_2026.py
+# calculate_leaderboard), kept verbatim apart from taking their frames as arguments.
+def legacy_leaderboard(p_df, r_df):
+    if p_df.empty or r_df.empty: return pd.DataFrame(columns=['Username', 'Current Points'])
+    p_df = p_df.copy(); r_df = r_df.copy()
+    p_df['MID'] = p_df['Match_ID'].astype(str).str.replace('.0', '', regex=False)
+    r_df['MID'] = r_df['Match_ID'].astype(str).str.replace('.0', '', regex=False)
+    merged = p_df.merge(r_df, on="MID", suffixes=('_u', '_r'))
+    def calc(r):
+        try:
+            u1, u2 = map(int, str(r['Score_u']).split('-')); r1, r2 = map(int, str(r['Score_r']).split('-'))
+            if u1 == r1 and u2 == r2: return 3
+            return 1 if (u1 > u2 and r1 > r2) or (u1 < u2 and r1 < r2) else 0
+        except: return 0
+    merged['Pts'] = merged.apply(calc, axis=1)
+    return merged.groupby('Username')['Pts'].sum().reset_index().rename(columns={'Pts': 'Current Points'}).sort_values('Current Points', ascending=False)
+
+def legacy_pl_leaderboard(users, subs, results):
+    if users.empty: return pd.DataFrame(columns=["Username", "Total"])
+    scores = {str(user): 0 for user in users['Username'].unique()}
+    if not subs.empty and not results.empty:
+        for _, res_row in results.iterrows():
+            night = res_row['Night']
+            night_subs = subs[subs['Night'] == night]
+            for _, sub_row in night_subs.iterrows():
+                u = str(sub_row['Username'])
+                if u in scores:
+                    pts = 0
+                    if sub_row['QF1'] == res_row['QF1']: pts += 2
+                    if sub_row['QF2'] == res_row['QF2']: pts += 2
+                    if sub_row['QF3'] == res_row['QF3']: pts += 2
+                    if sub_row['QF4'] == res_row['QF4']: pts += 2
+                    if sub_row['SF1'] == res_row['SF1']: pts += 3
+                    if sub_row['SF2'] == res_row['SF2']: pts += 3
+                    if sub_row['Final'] == res_row['Final']: pts += 5
+                    scores[u] += pts
+    lb = pd.DataFrame(list(scores.items()), columns=["Username", "Total"])
+    return lb.sort_values(by="Total", ascending=False)
+
+def totals(lb, col):
+    return dict(zip(lb['Username'].astype(str), lb[col].astype(int)))
+
+def typed(sheets, *names):
+    return [schema.coerce(ws, sheets[ws])[0] for ws in names]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_leaderboard_matches_legacy(seed):
+    sheets = workload.generate((30, 40, 4), seed=seed)
+    # Odd cells the old scorer shrugged off: blanks, junk, level scores, a duplicate pick.
+    preds = pd.concat([sheets["Predictions"], pd.DataFrame({"Username": ["user00001"] * 4, "Match_ID": [1.0, 2.0, 3.0, 1.0], "Score": ["0-0", " 6-2 ", None, "6-0"]})], ignore_index=True)
+    results = sheets["Results"]
+    p, r = schema.coerce("Predictions", preds)[0], schema.coerce("Results", results)[0]
+    assert totals(scoring.leaderboard(p, r), 'Current Points') == totals(legacy_leaderboard(preds, results), 'Current Points')
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pl_leaderboard_matches_legacy(seed):
+    sheets = workload.generate((30, 10, 8), seed=seed)
+    users, subs, results = typed(sheets, "Users", "User_Submissions", "PL_Results")
+    assert totals(scoring.pl_leaderboard(users, subs, results), 'Total') == totals(legacy_pl_leaderboard(users, subs, results), 'Total')
+
+def test_pl_leaderboard_empty_inputs():
+    users = pd.DataFrame({"Username": ["a", "b"]})
+    assert totals(scoring.pl_leaderboard(users, pd.DataFrame(), pd.DataFrame()), 'Total') == {"a": 0, "b": 0}
+    assert scoring.pl_leaderboard(pd.DataFrame(), pd.DataFrame(), pd.DataFrame()).empty
@@ -0,0 +1,28 @@
+import threading
+import time
+import pandas as pd
+import sheetcache
+
+def test_derived_is_keyed_on_the_versions_its_frames_were_read_at():
+    data = {"A": [1]}
+    refreshed = threading.Event()
+    def loader(ws):
+        if ws == "B":
+            refreshed.wait(2)  # B is slow: A's background refresh lands while B loads
+            return pd.DataFrame({"v": [0]})
+        df = pd.DataFrame({"v": data["A"]})
+        if data["A"] == [2]: refreshed.set()
+        return df
+    cache = sheetcache.SheetCache(loader, {"A": (0, 60)})
+    cache.get("A")
+    data["A"] = [2]
+    build = lambda a, b: a["v"].tolist()
+    assert cache.derived("sum", ("A", "B"), build) == [1]  # stale A served, refresh runs behind it
+    while "A" in cache._refreshing: time.sleep(0.01)
+    assert cache.derived("sum", ("A", "B"), build) == [2]
+
+def test_get_many_reports_the_version_of_the_frame_it_returns():
+    cache = sheetcache.SheetCache(lambda ws: pd.DataFrame({"v": [1]}))
+    (df, version), = cache.get_many(["A"]).values()
+    cache.invalidate("A")
+    assert version == 1 and cache.version("A") == 2 and df["v"].tolist() == [1]
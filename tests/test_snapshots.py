@@ -0,0 +1,18 @@
+import os
+import pandas as pd
+import snapshots
+
+def test_users_never_reach_disk(tmp_path):
+    store = snapshots.SnapshotStore(str(tmp_path))
+    users = pd.DataFrame({"Username": ["ann"], "Email": ["ann@example.com"], "Password": ["$2b$12$hash"]})
+    assert not store.save("Users", users)
+    assert store.save("Matches", pd.DataFrame({"Match_ID": [1]}))
+    assert os.listdir(tmp_path) == ["Matches.arrow"]
+    assert store.worksheets() == ["Matches"]
+
+def test_a_users_copy_from_before_is_removed(tmp_path):
+    snapshots.SnapshotStore(str(tmp_path), exclude=()).save("Users", pd.DataFrame({"Username": ["ann"]}))
+    assert os.path.exists(tmp_path / "Users.arrow")
+    store = snapshots.SnapshotStore(str(tmp_path))
+    assert not os.path.exists(tmp_path / "Users.arrow")
+    assert store.load("Users") is None
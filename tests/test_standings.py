@@ -0,0 +1,53 @@
+import pandas as pd
+import schema
+import scoring
+import standings
+
+def frame(ws, rows):
+    return schema.coerce(ws, pd.DataFrame(rows))[0]
+
+PREDS = frame("Predictions", [
+    {"Username": "ann", "Match_ID": 1, "Score": "6-2"}, {"Username": "bob", "Match_ID": 1, "Score": "2-6"},
+    {"Username": "ann", "Match_ID": 2, "Score": "6-4"}, {"Username": "bob", "Match_ID": 2, "Score": "6-4"},
+])
+DAY_OF = pd.Series(["2026-03-01", "2026-03-02"], index=pd.Index([1, 2], name="Match_ID"))
+
+def publish(results, history, lb, mid, score):
+    """The Admin publish path of app.py: move the table by this match, snapshot and re-chain its day."""
+    prev = results[results['Match_ID'] == mid] if not results.empty else results
+    new_row = frame("Results", [{"Match_ID": mid, "Score": score}])
+    results = pd.concat([results.drop(prev.index), new_row])
+    lb = scoring.leaderboard(PREDS, results) if lb.empty else standings.apply_delta(lb, standings.match_delta(PREDS, new_row, prev), 'Current Points')
+    day = DAY_OF[mid]
+    delta = standings.match_delta(PREDS, results[results['Match_ID'].isin(DAY_OF.index[DAY_OF == day])])
+    snaps = standings.rechain(history, day, delta)
+    history = pd.concat([history[~history['Day'].isin(snaps['Day'])], snaps], ignore_index=True) if not history.empty else snaps
+    return results, history, lb
+
+def latest(history):
+    snap = history[history['Day'] == history['Day'].max()]
+    return snap.set_index('Username')['Points'].sort_index()
+
+def test_correcting_an_earlier_day_carries_into_later_snapshots():
+    results, history, lb = frame("Results", []), pd.DataFrame(columns=standings.HISTORY_COLUMNS), pd.DataFrame()
+    results, history, lb = publish(results, history, lb, 1, "6-2")
+    results, history, lb = publish(results, history, lb, 2, "6-4")
+    results, history, lb = publish(results, history, lb, 1, "2-6")
+    assert latest(history).to_dict() == lb.set_index('Username')['Current Points'].sort_index().to_dict()
+    assert latest(history).to_dict() == {"ann": 3, "bob": 6}
+    assert history.groupby('Day').size().to_dict() == {"2026-03-01": 2, "2026-03-02": 2}
+
+def test_a_day_completed_late_is_slotted_in_before_later_snapshots():
+    results, history, lb = frame("Results", []), pd.DataFrame(columns=standings.HISTORY_COLUMNS), pd.DataFrame()
+    results, history, lb = publish(results, history, lb, 2, "6-4")
+    results, history, lb = publish(results, history, lb, 1, "6-2")
+    scored = scoring.score_predictions(PREDS, results)
+    rebuilt = standings.replay(standings.day_deltas(scored, scored['Match_ID'].map(DAY_OF), standings.complete_days(DAY_OF, results)))
+    got = history.sort_values(['Day', 'Username']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, rebuilt.sort_values(['Day', 'Username']).reset_index(drop=True), check_dtype=False)
+
+def test_rechain_respects_an_explicit_night_order():
+    history = standings.replay([("Belfast", pd.Series({"ann": 5})), ("Aberdeen", pd.Series({"ann": 2, "bob": 4}))])
+    snaps = standings.rechain(history, "Belfast", pd.Series({"bob": 1}), ["Belfast", "Aberdeen"])
+    assert snaps['Day'].unique().tolist() == ["Belfast", "Aberdeen"]
+    assert snaps[snaps['Day'] == "Aberdeen"].set_index('Username')['Points'].to_dict() == {"ann": 2, "bob": 5}
@@ -0,0 +1,98 @@
+import threading
+import time
+import pandas as pd
+import storage
+
+def submit_all(queues, worksheet, rows):
+    # Each queue stands for one process (app.py, the PL app); every row is submitted once, concurrently.
+    results, threads = {}, []
+    for i, row in enumerate(rows):
+        q = queues[i % len(queues)]
+        threads.append(threading.Thread(target=lambda i=i, q=q, row=row: results.__setitem__(i, q.submit(worksheet, row))))
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return results
+
+def test_two_writers_never_lose_a_reported_row():
+    conn = storage.FakeConnection({"Users": pd.DataFrame({"Username": ["seed"], "Password": ["x"]})}, latency=0.002)
+    queues = [storage.WriteQueue(storage.GSheetsBackend(conn, "s"), backoff=0.01) for _ in range(2)]
+    rows = [{"Username": f"u{i}", "Password": "p", "Email": f"u{i}@x"} for i in range(80)]
+    results = submit_all(queues, "Users", rows)
+    stored = set(storage.GSheetsBackend(conn, "s").read("Users")['Username'])
+    assert all(results.values())
+    assert {r["Username"] for r in rows} <= stored
+
+def test_append_to_missing_and_empty_sheets_is_append_only():
+    conn = storage.FakeConnection({"Empty": pd.DataFrame()})
+    backend = storage.GSheetsBackend(conn, "s")
+    backend.append("Empty", pd.DataFrame([{"Username": "a"}]))
+    backend.append("Predictions@x", pd.DataFrame([{"Username": "a", "Match_ID": 1, "Score": "6-2"}]))
+    backend.append("Predictions@x", pd.DataFrame([{"Username": "b", "Match_ID": 1, "Score": "2-6", "Note": "new column"}]))
+    assert backend.read("Empty")['Username'].tolist() == ["a"]
+    p = backend.read("Predictions@x")
+    assert p['Username'].tolist() == ["a", "b"] and p['Note'].isna().tolist() == [True, False]
+
+def test_rehash_upsert_keeps_concurrent_registrations():
+    conn = storage.FakeConnection({"Users": pd.DataFrame({"Username": ["old"], "Password": ["plain"]})}, latency=0.002)
+    register, login = (storage.WriteQueue(storage.GSheetsBackend(conn, "s"), backoff=0.01) for _ in range(2))
+    rows = [{"Username": f"u{i}", "Password": "p"} for i in range(20)]
+    rehash = threading.Thread(target=lambda: [login.upsert("Users", pd.DataFrame([{"Username": "old", "Password": f"hash{i}"}]), ["Username"]) for i in range(10)])
+    rehash.start(); results = submit_all([register], "Users", rows); rehash.join()
+    users = storage.GSheetsBackend(conn, "s").read("Users")
+    assert all(results.values())
+    assert set(users['Username']) == {"old"} | {r["Username"] for r in rows}
+    assert users.loc[users['Username'] == "old", 'Password'].tolist() == ["hash9"]
+
+def test_upsert_replaces_key_groups_in_place():
+    conn = storage.FakeConnection({"History": pd.DataFrame({"Day": ["d1", "d1", "d2"], "Username": ["a", "b", "a"]})})
+    backend = storage.GSheetsBackend(conn, "s")
+    backend.upsert("History", pd.DataFrame({"Day": ["d1"], "Username": ["z"]}), ["Day"])
+    backend.upsert("History", pd.DataFrame({"Day": ["d2", "d2", "d3"], "Username": ["y", "w", "v"]}), ["Day"])
+    h = backend.read("History")
+    assert list(zip(h['Day'], h['Username'])) == [("d1", "z"), ("d2", "y"), ("d2", "w"), ("d3", "v")]
+
+def test_write_creates_a_missing_worksheet():
+    # FakeConnection.create rejects spreadsheet= like the service-account client does.
+    conn = storage.FakeConnection({"Users": pd.DataFrame({"Username": ["a"], "League": ["x"]})})
+    backend = storage.GSheetsBackend(conn, "s")
+    backend.write("Standings@x", pd.DataFrame({"Username": ["a"], "Current Points": [3]}))
+    assert backend.read("Standings@x")['Current Points'].tolist() == [3]
+    assert storage.WriteQueue(backend).submit("Predictions@x", {"Username": "a", "Match_ID": 1, "Score": "6-2"})
+    backend.upsert("Standings_History@x", pd.DataFrame({"Day": ["d1"], "Username": ["a"]}), ["Day"])
+    assert set(conn.sheets) == {"Users", "Standings@x", "Predictions@x", "Standings_History@x"}
+
+def test_submit_never_reads_the_whole_sheet():
+    conn = storage.FakeConnection({"Predictions": pd.DataFrame({"Username": ["a"], "Match_ID": [1], "Score": ["6-2"]})})
+    cached = storage.GSheetsBackend(conn, "s").read("Predictions")
+    queue = storage.WriteQueue(storage.GSheetsBackend(conn, "s"), known=lambda ws: cached)
+    reads = conn.reads
+    assert queue.submit("Predictions", {"Username": "b", "Match_ID": 1, "Score": "1-6"})
+    assert not queue.submit("Predictions", {"Username": "b", "Match_ID": 1, "Score": "6-6"})  # this queue wrote it
+    assert not queue.submit("Predictions", {"Username": "a", "Match_ID": 1.0, "Score": "0-6"})  # in the cached copy
+    assert conn.reads == reads
+    assert len(storage.GSheetsBackend(conn, "s").read("Predictions")) == 2
+
+class FlakyBackend:
+    """Appends land, but the first one reports an error anyway; everything else passes through."""
+    def __init__(self, backend):
+        self.backend, self.failed = backend, False
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+    def append(self, worksheet, rows):
+        self.backend.append(worksheet, rows)
+        if not self.failed:
+            self.failed = True
+            raise ConnectionError("timed out")
+
+def test_a_failed_append_is_checked_not_duplicated_and_backs_off_outside_the_lock():
+    conn = storage.FakeConnection({"Users": pd.DataFrame({"Username": ["seed"], "Password": ["x"]})})
+    backend = FlakyBackend(storage.GSheetsBackend(conn, "s"))
+    queue = storage.WriteQueue(backend, backoff=0.5)
+    done = {}
+    first = threading.Thread(target=lambda: done.__setitem__("a", (queue.submit("Users", {"Username": "a", "Password": "p"}), time.monotonic())))
+    first.start(); time.sleep(0.1)
+    assert queue.submit("Users", {"Username": "b", "Password": "p"})  # not stuck behind a's backoff
+    b_done = time.monotonic()
+    first.join()
+    assert done["a"][0] and b_done < done["a"][1]
+    assert storage.GSheetsBackend(conn, "s").read("Users")['Username'].tolist() == ["seed", "a", "b"]
@@ -0,0 +1,21 @@
+import json
+import telemetry
+
+def test_events_stay_in_memory_without_a_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rec = telemetry.Recorder()
+    with rec.span("page", "Predictions"): pass
+    assert len(rec.frame()) == 1 and not list(tmp_path.iterdir())
+
+def test_log_is_kept_open_and_rotated(tmp_path):
+    log = tmp_path / "telemetry.jsonl"
+    rec = telemetry.Recorder(str(log), max_bytes=2000)
+    rec.record({"kind": "rerun", "name": "first"})
+    handle = rec._file
+    for i in range(60): rec.record({"kind": "rerun", "name": f"r{i}"})
+    rec.close()
+    assert handle.closed and (tmp_path / "telemetry.jsonl.1").exists()
+    assert log.stat().st_size <= 2000 and (tmp_path / "telemetry.jsonl.1").stat().st_size <= 2000
+    names = [json.loads(l)["name"] for f in ("telemetry.jsonl.1", "telemetry.jsonl") for l in open(tmp_path / f)]
+    assert names[-1] == "r59" and names == sorted(names, key=lambda n: -1 if n == "first" else int(n[1:]))
+    assert len(rec.frame()) == 61
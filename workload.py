@@ -0,0 +1,92 @@
+"""Synthetic sheets for local runs and benchmarks.
+
+    sheets = workload.generate("10k")
+    backend = storage.GSheetsBackend(storage.FakeConnection(sheets), "fake")
+
+Frames look like what GSheetsConnection.read returns: ids as floats, scores and dates as text,
+a few malformed cells, and no Standings / PL_Standings so the apps rebuild them on first load."""
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import auth
+import scoring
+
+# Scale name -> (users, matches, PL nights); Predictions holds ~80% of users x matches.
+SCALES = {"100": (5, 25, 2), "10k": (200, 60, 8), "1m": (10000, 125, 16)}
+FIRST = ["Luke", "Michael", "Gerwyn", "Nathan", "Stephen", "Rob", "Peter", "Gary", "Jonny", "Danny", "Josh", "Dimitri", "Damon", "Chris", "Ryan", "Dave"]
+LAST = ["Littler", "Humphries", "van Gerwen", "Price", "Aspinall", "Bunting", "Cross", "Wright", "Anderson", "Clayton", "Noppert", "Rock", "Van den Bergh", "Heta", "Dobey", "Searle"]
+MALFORMED = ["", "6 - ", "tbc", "7-x"]
+
+def players(n=32):
+    return [f"{FIRST[i % len(FIRST)]} {LAST[(i * 7 + i // len(FIRST)) % len(LAST)]}" for i in range(n)]
+
+def _scores(rng, n, malformed=0.0):
+    winner = rng.integers(0, 2, n)
+    loser = rng.integers(0, 6, n)
+    text = np.where(winner == 0, [f"6-{x}" for x in loser], [f"{x}-6" for x in loser]).astype(object)
+    bad = rng.random(n) < malformed
+    text[bad] = rng.choice(MALFORMED, bad.sum())
+    return text
+
+def generate(scale="10k", seed=0, now=None):
+    """Raw sheets keyed by worksheet name. `scale` is a SCALES key or a (users, matches, nights) tuple."""
+    n_users, n_matches, n_nights = SCALES[scale] if isinstance(scale, str) else scale
+    rng = np.random.default_rng(seed)
+    now = now or datetime.now().replace(minute=0, second=0, microsecond=0)
+    names = players()
+    usernames = [f"user{i:05d}" for i in range(n_users)]
+
+    # Passwords are user i's "pw{i}": the last user's is a PBKDF2 hash (what bench.py logs in with),
+    # the rest stay legacy plaintext, as in a sheet from before auth.py (hashing them all would
+    # take minutes at the 1m scale).
+    passwords = [f"pw{i}" for i in range(n_users)]
+    passwords[-1] = auth.hash_password(passwords[-1], salt=f"{seed:032x}")
+    users = pd.DataFrame({"Username": usernames, "Password": passwords,
+                          "Email": [f"user{i}@example.com" if i % 4 else "" for i in range(n_users)]})
+
+    # Half the matches are already played, the rest spread over the coming days.
+    offsets = (np.arange(n_matches) - n_matches // 2) * 3
+    pairs = rng.permutation(len(names))[:2 * n_matches] if 2 * n_matches <= len(names) else rng.integers(0, len(names), 2 * n_matches)
+    p1, p2 = [names[i] for i in pairs[0::2]], [names[i] for i in pairs[1::2]]
+    p2 = [b if a != b else names[(names.index(b) + 1) % len(names)] for a, b in zip(p1, p2)]
+    ids = np.arange(1, n_matches + 1, dtype=float)
+    matches = pd.DataFrame({"Match_ID": ids, "Date": [str(now + timedelta(hours=int(h))) for h in offsets],
+                            "Player1": p1, "Player2": p2,
+                            "P1_Image": [f"https://img.example/{p.replace(' ', '_')}.png" for p in p1],
+                            "P2_Image": [f"https://img.example/{p.replace(' ', '_')}.png" for p in p2]})
+    played = ids[offsets < 0]
+    results = pd.DataFrame({"Match_ID": played, "Score": _scores(rng, len(played))})
+
+    grid = rng.random((n_users, n_matches)) < 0.8
+    u_idx, m_idx = np.nonzero(grid)
+    predictions = pd.DataFrame({"Username": np.asarray(usernames, dtype=object)[u_idx], "Match_ID": ids[m_idx],
+                                "Score": _scores(rng, len(u_idx), malformed=0.002)})
+
+    stats = pd.DataFrame({"Player Name": names, "Nickname": [f"The {n.split()[-1]}" for n in names],
+                          "World Ranking": np.arange(1, len(names) + 1).astype(float),
+                          "Total Earnings": [f"£{x:,}" for x in rng.integers(50_000, 3_000_000, len(names))],
+                          "Televised Titles": rng.integers(0, 40, len(names)).astype(float),
+                          "Season Win %": [f"{x}%" for x in rng.integers(30, 80, len(names))],
+                          "Highest Average": np.round(rng.uniform(95, 115, len(names)), 1),
+                          "Checkout %": [f"{x}%" for x in rng.integers(30, 50, len(names))],
+                          "180s (12m)": rng.integers(50, 900, len(names)).astype(float)})
+
+    nights = [f"Night {n}" for n in range(1, n_nights + 1)]
+    lineup = [rng.permutation(names[:8]) for _ in nights]
+    admin = pd.DataFrame([{"Night": night, "Venue": "Arena", "Cutoff": str(now + timedelta(days=n - n_nights // 2)),
+                           **{f"QF{i}-P{j}": order[2 * (i - 1) + j - 1] for i in range(1, 5) for j in (1, 2)}}
+                          for n, (night, order) in enumerate(zip(nights, lineup), 1)])
+
+    def bracket(order):
+        qf = [order[2 * i + rng.integers(0, 2)] for i in range(4)]
+        sf = [qf[rng.integers(0, 2)], qf[2 + rng.integers(0, 2)]]
+        return dict(zip(scoring.PL_ROUNDS, qf + sf + [sf[rng.integers(0, 2)]]))
+    subs = pd.DataFrame([{"Username": u, "Night": night, **bracket(order)}
+                         for night, order in zip(nights, lineup) for u in usernames if rng.random() < 0.7])
+    pl_results = pd.DataFrame([{"Night": night, **bracket(order)} for night, order in list(zip(nights, lineup))[:n_nights // 2]])
+
+    return {"Users": users, "Matches": matches, "Predictions": predictions, "Results": results, "Stats": stats,
+            "Players": pd.DataFrame({"Name": names, "Image_URL": [f"https://img.example/{n.replace(' ', '_')}.png" for n in names]}),
+            "PL_2026_Admin": admin, "User_Submissions": subs, "PL_Results": pl_results,
+            "Standings": pd.DataFrame(columns=["Username", "Current Points"]), "PL_Standings": pd.DataFrame(columns=["Username", "Total"]),
+            "Reminders": pd.DataFrame(columns=["Date", "Username", "Sent_At"])}